@@ -34,8 +34,26 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS")
 # DATABASES
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+# Requests run in autocommit; views declare their transactions, see core.viewmixins.AtomicActionsMixin
 DATABASES = {"default": env.db("DATABASE_URL")}
-DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Read replicas of the default database, used by the reads of safe requests, see core.routers.ReplicaRouter
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[]), start=1):
+    DATABASES[f"replica_{index}"] = {**env.db_url_config(url), "TEST": {"MIRROR": "default"}}
+    DATABASE_REPLICAS.append(f"replica_{index}")
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# How long after a write a client keeps reading from the primary, should exceed the replication lag
+DATABASE_REPLICA_STICKY_SECONDS = env.int("DATABASE_REPLICA_STICKY_SECONDS", default=5)
+
+# CACHES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/settings/#caches
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    # Rendered specification trees, off unless set to a cache shared by every process (e.g. redis://)
+    "specifications": env.cache("SPECIFICATION_CACHE_URL", default="dummycache://"),
+}
+
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -77,7 +95,9 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -172,6 +192,13 @@ LOGGING = {
 }
 
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
     "PAGE_SIZE": 10,
 }
+
+# STUFFS
+# ------------------------------------------------------------------------------
+# Number of NDJSON lines validated and committed together by the streaming import
+SPECIFICATION_IMPORT_CHUNK_SIZE = env.int("SPECIFICATION_IMPORT_CHUNK_SIZE", default=500)
+# Line errors an import reports in full; further ones are only counted
+SPECIFICATION_IMPORT_MAX_ERRORS = env.int("SPECIFICATION_IMPORT_MAX_ERRORS", default=1000)
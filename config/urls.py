@@ -17,8 +17,11 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import RedirectView
 
+from core.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/stuffs/", include("stuffs.urls")),
+    path("metrics", metrics, name="metrics"),
     path("", RedirectView.as_view(url="api/stuffs/")),
 ]
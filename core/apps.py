@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from .metrics import install_query_recorder
+
+        # Connections are created per thread, so this also covers the ORM calls of async views
+        connection_created.connect(install_query_recorder, dispatch_uid="core.metrics.install_query_recorder")
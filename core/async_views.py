@@ -0,0 +1,66 @@
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .pagination import KeysetPagination
+
+
+class AsyncReadView(View):
+    """
+    Read-only JSON endpoint served natively by the ASGI application.
+
+    Queries go through the async ORM and the rows are rendered with a regular DRF serializer, so the
+    responses are the same as the ones of the sync viewsets. Everything the serializer reads must be
+    loaded by the query, e.g. with ``prefetch_related()``, as it can't query the database itself.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    queryset = None
+    serializer_class = None
+    renderer = JSONRenderer()
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type=self.renderer.media_type)
+
+    def not_found(self):
+        return self.render({"detail": "Not found."}, status_code=status.HTTP_404_NOT_FOUND)
+
+    def get_serializer(self, *args, request, **kwargs):
+        return self.serializer_class(*args, context={"request": request}, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aget(Request(request), *args, **kwargs)
+
+    async def aget(self, request, *args, **kwargs):
+        raise NotImplementedError("`aget()` must be implemented.")
+
+
+class AsyncListView(AsyncReadView):
+    pagination_class = KeysetPagination
+
+    async def get_queryset(self, **kwargs):
+        """Return the queryset to list, or ``None`` if the parent resource doesn't exist."""
+        return self.queryset.all()
+
+    async def aget(self, request, **kwargs):
+        queryset = await self.get_queryset(**kwargs)
+        if queryset is None:
+            return self.not_found()
+
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request)
+        data = self.get_serializer(page, many=True, request=request).data
+
+        return self.render(paginator.get_paginated_response(data).data)
+
+
+class AsyncDetailView(AsyncReadView):
+    async def aget(self, request, pk):
+        try:
+            instance = await self.queryset.aget(pk=pk)
+        except self.queryset.model.DoesNotExist:
+            return self.not_found()
+
+        return self.render(self.get_serializer(instance, request=request).data)
@@ -0,0 +1,74 @@
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+class VersionRegistry:
+    """
+    Opaque version tokens of cached objects, kept in a cache alias.
+
+    A token is a random value created on first read and dropped when the object changes, so the next
+    read creates a new one. Entries cached under a dropped token are never read again, and a token lost
+    to eviction or a restart only costs a cache miss: versions can't go back to an earlier value.
+    """
+
+    def __init__(self, model, alias="default"):
+        self.model = model
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def process_local(self):
+        """Whether the versions are kept in this process only, so bumps from other processes don't reach it."""
+        return isinstance(self.cache, LocMemCache)
+
+    @property
+    def shared(self):
+        """Whether the versions see the bumps of every process, so what is cached under them can be trusted."""
+        return not isinstance(self.cache, (DummyCache, LocMemCache))
+
+    def key(self, pk):
+        return f"{self.model._meta.label_lower}:version:{pk}"
+
+    @property
+    def collection_key(self):
+        return self.key("*")
+
+    def get(self, pk):
+        key = self.key(pk)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, uuid4().hex)
+            version = self.cache.get(key) or uuid4().hex
+
+        return version
+
+    def get_collection(self):
+        """The version of the whole collection, dropped whenever any object's version is."""
+        return self.get("*")
+
+    def bump(self, pks, using=None):
+        """
+        Drop the versions of ``pks`` now and again when the current transaction commits.
+
+        The second bump discards anything a concurrent read cached from the data as it was before the commit.
+        """
+        keys = [self.key(pk) for pk in set(pks) if pk is not None]
+        if not keys:
+            return
+
+        self.bump_keys([*keys, self.collection_key], using=using)
+
+    def bump_collection(self, using=None):
+        """Drop the collection version only, e.g. after inserting objects too many to bump one by one."""
+        self.bump_keys([self.collection_key], using=using)
+
+    def bump_keys(self, keys, using=None):
+        self.cache.delete_many(keys)
+        transaction.on_commit(lambda: self.cache.delete_many(keys), using=using)
@@ -0,0 +1,33 @@
+import csv
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+
+class Echo:
+    """Pseudo-buffer for ``csv.writer`` that hands back each written row instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def streaming_csv_response(rows, header, filename, rows_per_chunk=500):
+    """
+    Stream ``rows`` as a CSV attachment.
+
+    The header is sent before ``rows`` is first iterated, so a lazy queryset iterator only starts
+    its query once the response is already flowing. Rows are sent in chunks of ``rows_per_chunk``.
+    """
+    writer = csv.writer(Echo(), lineterminator="\n")
+
+    def content():
+        yield writer.writerow(header)
+
+        rows_iterator = iter(rows)
+        while chunk := list(islice(rows_iterator, rows_per_chunk)):
+            yield "".join(writer.writerow(row) for row in chunk)
+
+    response = StreamingHttpResponse(content(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    return response
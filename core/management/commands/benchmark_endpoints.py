@@ -0,0 +1,282 @@
+import json
+from statistics import median, quantiles
+from time import perf_counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.metrics import RequestMetrics
+from stuffs.models import Component, Specification
+from stuffs.seeding import SCALES, DatasetGenerator, seed_dataset
+
+# The benchmark measures the work of the endpoints, not the response cache
+NO_CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"} for alias in ["default", "specifications"]
+}
+# Records the generator of the seeded dataset, which --keepdb only reuses for the same seed and shape
+MARKER_TABLE = "benchmark_dataset"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a reproducible dataset in a test database and measure the latency and query count of the main "
+        "endpoints, optionally comparing them with a previous run"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="1k", help="Number of components of the dataset.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the generated dataset.")
+        parser.add_argument("--workers", type=int, default=1, help="Processes seeding the dataset (not on SQLite).")
+        parser.add_argument("--iterations", type=int, default=30, help="Measured requests per endpoint.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="JSON results of a previous run to compare with.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2, help="Slowdown of the p50 latency reported as a regression."
+        )
+        parser.add_argument("--with-cache", action="store_true", help="Keep the response caches enabled.")
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Keep the seeded test database, to reuse it on the next run."
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 2:
+            raise CommandError("At least 2 iterations are needed to compute percentiles.")
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            generator = DatasetGenerator(SCALES[options["scale"]], seed=options["seed"])
+            self.seed(generator, options["workers"])
+
+            # Only the test database is seeded: replicas would serve the reads from another database
+            overrides = {"DATABASE_REPLICAS": []}
+            if not options["with_cache"]:
+                overrides["CACHES"] = NO_CACHES
+            with override_settings(**overrides):
+                results = {
+                    "meta": {
+                        "vendor": connection.vendor,
+                        "scale": options["scale"],
+                        "seed": options["seed"],
+                        "iterations": options["iterations"],
+                        "with_cache": options["with_cache"],
+                    },
+                    "endpoints": self.run(options["iterations"]),
+                }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(results, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if baseline is not None:
+            self.compare(baseline, results, options["threshold"])
+
+    def seed(self, generator, workers):
+        marker = json.dumps(vars(generator), sort_keys=True)
+        if self.read_marker() == marker and Component.objects.count() == generator.components:
+            self.stdout.write(f"Reusing the seeded dataset of {generator.components} components.")
+            return
+
+        call_command("flush", interactive=False, verbosity=0)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {MARKER_TABLE}")
+        started = perf_counter()
+        seed_dataset(generator, workers=workers)
+        self.stdout.write(f"Seeded {generator.components} components in {perf_counter() - started:.1f} s.")
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {MARKER_TABLE} (generator text NOT NULL)")
+            cursor.execute(f"INSERT INTO {MARKER_TABLE} (generator) VALUES (%s)", [marker])
+
+    def read_marker(self):
+        """The generator of the dataset in the database, as saved by ``seed()``, or ``None``."""
+        if MARKER_TABLE not in connection.introspection.table_names():
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT generator FROM {MARKER_TABLE}")
+            row = cursor.fetchone()
+
+        return row and row[0]
+
+    def scenarios(self):
+        """``(name, method, build)``, where ``build(iteration)`` returns the URL and the payload of a request."""
+        pks = list(Specification.objects.order_by("pk").values_list("pk", flat=True))
+        # A spread of specifications, the same ones on every run of the same dataset
+        sample = pks[:: max(1, len(pks) // 20)]
+        cloneable = list(
+            Specification.objects.filter(status__in=["Planning Phase", "Planning Ready"])
+            .order_by("pk")
+            .values_list("pk", flat=True)[:20]
+        )
+        components = self.assigned_components()
+
+        def pick(values, iteration):
+            return values[iteration % len(values)]
+
+        def import_payload(iteration):
+            return {
+                "specifications": [
+                    {
+                        "name": f"Benchmark {iteration}",
+                        "code_number": "BENCH",
+                        "status": "Planning Phase",
+                        "groups": [
+                            {
+                                "name": f"Benchmark group {iteration}-{group}",
+                                "group_code": f"BG-{group}",
+                                "components": [
+                                    {"name": f"Component {number}", "description": "Benchmark", "part_code": None}
+                                    for number in range(10)
+                                ],
+                            }
+                            for group in range(3)
+                        ],
+                    }
+                ]
+            }
+
+        return [
+            ("specification-list", "get", lambda i: ("/api/stuffs/specifications/", None)),
+            ("specification-detail", "get", lambda i: (f"/api/stuffs/specifications/{pick(sample, i)}/", None)),
+            (
+                "specification-groups-list",
+                "get",
+                lambda i: (f"/api/stuffs/specifications/{pick(sample, i)}/groups/", None),
+            ),
+            (
+                "specification-components-list",
+                "get",
+                lambda i: (f"/api/stuffs/specifications/{pick(sample, i)}/components/", None),
+            ),
+            (
+                "specification-export-built-specification-report",
+                "get",
+                lambda i: ("/api/stuffs/specifications/export_built_specification_report/", None),
+            ),
+            (
+                "specification-clone",
+                "post",
+                lambda i: (f"/api/stuffs/specifications/{pick(cloneable, i)}/clone/", {"include_parts": True}),
+            ),
+            (
+                "specification-import-data",
+                "post",
+                lambda i: ("/api/stuffs/specifications/import_data/", import_payload(i)),
+            ),
+            (
+                "component-assign-part",
+                "patch",
+                lambda i: (f"/api/stuffs/components/{pick(components, i)}/assign_part/", {"part_code": f"B-{i}"}),
+            ),
+        ]
+
+    def assigned_components(self):
+        """The components whose part codes the ``component-assign-part`` scenario changes."""
+        return list(
+            Component.objects.filter(specification__completed=False).order_by("pk").values_list("pk", flat=True)[:20]
+        )
+
+    def snapshot(self):
+        """What the write scenarios change: the last specification id and the part codes of the assigned components."""
+        last_pk = Specification.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+        part_codes = dict(Component.objects.filter(pk__in=self.assigned_components()).values_list("pk", "part_code"))
+
+        return last_pk, part_codes
+
+    def restore(self, snapshot):
+        """Delete the specifications created since ``snapshot`` and put the part codes back, as seeded."""
+        last_pk, part_codes = snapshot
+        with transaction.atomic():
+            Specification.objects.filter(pk__gt=last_pk).delete()
+            for component in Component.objects.select_for_update().filter(pk__in=part_codes):
+                if component.part_code != part_codes[component.pk]:
+                    component.part_code = part_codes[component.pk]
+                    component.save(update_fields=["part_code"])
+
+    def run(self, iterations):
+        client = Client()
+        endpoints = {}
+        snapshot = self.snapshot()
+        for name, method, build in self.scenarios():
+            latencies, queries = [], []
+            # The first requests warm up the connection and the hyperlink templates
+            for iteration in range(-3, iterations):
+                request_metrics = self.request(client, method, *build(iteration))
+                if iteration >= 0:
+                    latencies.append(request_metrics.duration * 1000)
+                    queries.append(request_metrics.queries)
+            if method != "get":
+                # Outside the measured requests, so their transactions commit as in production
+                self.restore(snapshot)
+
+            percentiles = quantiles(latencies, n=100)
+            endpoints[name] = {
+                "p50_ms": round(percentiles[49], 2),
+                "p95_ms": round(percentiles[94], 2),
+                "p99_ms": round(percentiles[98], 2),
+                "mean_ms": round(sum(latencies) / len(latencies), 2),
+                "queries": median(queries),
+                "max_queries": max(queries),
+            }
+            self.stdout.write(
+                f"{name}: p50 {endpoints[name]['p50_ms']} ms, p95 {endpoints[name]['p95_ms']} ms, "
+                f"p99 {endpoints[name]['p99_ms']} ms, {endpoints[name]['queries']} queries"
+            )
+
+        return endpoints
+
+    def request(self, client, method, url, data):
+        """Send a request and return its ``RequestMetrics``."""
+        request_metrics = RequestMetrics()
+        with connection.execute_wrapper(request_metrics):
+            response = getattr(client, method)(url, data, content_type="application/json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+            request_metrics.stop()
+
+        if response.status_code >= 400:
+            raise CommandError(f"{method.upper()} {url} failed with {response.status_code}: {response.content[:500]}")
+
+        return request_metrics
+
+    def compare(self, baseline, results, threshold):
+        for key in ["vendor", "scale", "with_cache"]:
+            if baseline["meta"][key] != results["meta"][key]:
+                raise CommandError(
+                    f"Can't compare runs with a different {key}: {baseline['meta'][key]} and {results['meta'][key]}."
+                )
+
+        regressions = []
+        for name, result in results["endpoints"].items():
+            previous = baseline["endpoints"].get(name)
+            if previous is None:
+                continue
+
+            if previous["p50_ms"]:
+                change = result["p50_ms"] / previous["p50_ms"] - 1
+            else:
+                change = float("inf") if result["p50_ms"] else 0.0
+            regressed = change > threshold or result["queries"] > previous["queries"]
+            self.stdout.write(
+                f"{name}: p50 {previous['p50_ms']} -> {result['p50_ms']} ms ({change:+.0%}), "
+                f"queries {previous['queries']} -> {result['queries']}{'  REGRESSION' if regressed else ''}"
+            )
+            if regressed:
+                regressions.append(name)
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} endpoints regressed: {', '.join(regressions)}.")
+        self.stdout.write("No regressions.")
@@ -0,0 +1,54 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.serializers import stock_hyperlinked_serializer
+from stuffs.models import Component
+from stuffs.serializers import ComponentSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare the serialization time of components with the stock and the cached hyperlink fields"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Number of components serialized per run.")
+        parser.add_argument("--repeat", type=int, default=5, help="Number of runs, the best one is reported.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        # Unsaved components: the benchmark measures serialization only and doesn't need a database
+        components = [
+            Component(
+                pk=pk,
+                name=f"Component {pk}",
+                description="Benchmark",
+                part_code=f"P-{pk}",
+                specification_id=pk // 100 + 1,
+                group_id=pk // 10 + 1,
+                created=now,
+                modified=now,
+            )
+            for pk in range(1, options["rows"] + 1)
+        ]
+        request = Request(APIRequestFactory().get("/api/stuffs/components/"))
+
+        timings, outputs = {}, {}
+        for name, serializer_class in [
+            ("stock", stock_hyperlinked_serializer(ComponentSerializer)),
+            ("cached", ComponentSerializer),
+        ]:
+            best = None
+            for _ in range(options["repeat"]):
+                started = perf_counter()
+                outputs[name] = serializer_class(components, many=True, context={"request": request}).data
+                elapsed = perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+            self.stdout.write(f"{name}: {best * 1000:.1f} ms for {len(components)} components")
+
+        if outputs["stock"] != outputs["cached"]:
+            raise CommandError("The cached hyperlinks differ from the stock ones.")
+        self.stdout.write(f"Speedup: {timings['stock'] / timings['cached']:.2f}x")
@@ -0,0 +1,43 @@
+import json
+import sys
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db import supports_copy
+from stuffs.importers import BulkSpecificationLoad
+
+
+class Command(BaseCommand):
+    help = (
+        "Load specification trees from a trusted newline-delimited JSON feed, as exported by "
+        "export_data?format=ndjson, with COPY and a set-based merge on PostgreSQL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON file to load, or - to read the standard input.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=5000, help="Specifications validated and sent to the database at once."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT when COPY is unavailable.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Loading specifications with {'COPY' if supports_copy() else 'bulk inserts'}...")
+
+        started = perf_counter()
+        load = BulkSpecificationLoad(chunk_size=options["chunk_size"], batch_size=options["batch_size"])
+        if options["path"] == "-":
+            load.run(sys.stdin)
+        else:
+            with open(options["path"], encoding="utf-8") as lines:
+                load.run(lines)
+        elapsed = perf_counter() - started
+
+        for error in load.errors:
+            self.stderr.write(f"Line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            f"Loaded {load.imported} of {load.lines} specifications in {elapsed:.1f} s "
+            f"({load.imported / max(elapsed, 1e-9):,.0f} specifications/s)."
+        )
+        if load.errors:
+            raise CommandError(f"{len(load.errors)} lines were rejected; the other lines were loaded.")
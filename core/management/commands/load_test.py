@@ -0,0 +1,81 @@
+import asyncio
+from statistics import quantiles
+from time import perf_counter
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Client:
+    """Minimal HTTP/1.1 client keeping its connection alive between requests."""
+
+    def __init__(self, url):
+        self.url = urlsplit(url)
+        self.path = f"{self.url.path or '/'}{'?' if self.url.query else ''}{self.url.query}"
+        self.reader = self.writer = None
+
+    async def get(self):
+        """Send a ``GET`` and return its status code once the whole response is read."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.url.hostname, self.url.port or 80)
+
+        self.writer.write(
+            f"GET {self.path} HTTP/1.1\r\nHost: {self.url.netloc}\r\nAccept: application/json\r\n\r\n".encode()
+        )
+        status_line, *header_lines = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        headers = dict(line.lower().split(": ", 1) for line in header_lines if line)
+        if "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            await self.reader.read()
+            await self.close()
+
+        return int(status_line.split()[1])
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = "Send concurrent GET requests to each URL and report the requests per second and the latencies"
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="+", help="URLs to load, e.g. a sync and an async endpoint to compare.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Number of concurrent connections.")
+        parser.add_argument("--requests", type=int, default=2000, help="Number of requests sent to each URL.")
+
+    def handle(self, *args, **options):
+        for url in options["urls"]:
+            if urlsplit(url).scheme != "http":
+                raise CommandError(f"Only http:// URLs can be loaded: {url}")
+
+            elapsed, latencies, errors = asyncio.run(self.load(url, options["concurrency"], options["requests"]))
+            p50, p95, p99 = (quantiles(latencies, n=100)[index] * 1000 for index in (49, 94, 98))
+            self.stdout.write(
+                f"{url}: {len(latencies) / elapsed:.0f} requests/s, latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, "
+                f"p99 {p99:.1f} ms, {errors} errors"
+            )
+
+    async def load(self, url, concurrency, requests):
+        remaining = iter(range(requests))
+        latencies, errors = [], 0
+
+        async def worker():
+            nonlocal errors
+            client = Client(url)
+            try:
+                for _ in remaining:
+                    started = perf_counter()
+                    status_code = await client.get()
+                    latencies.append(perf_counter() - started)
+                    errors += status_code >= 400
+            finally:
+                await client.close()
+
+        started = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        return perf_counter() - started, latencies, errors
@@ -0,0 +1,45 @@
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from stuffs.jobs import claim_import_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = "Run queued specification import jobs. Start several processes to drain the queue in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty.")
+        parser.add_argument(
+            "--poll-interval", type=float, default=2.0, help="Seconds to wait when the queue is empty."
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=600,
+            help="Seconds without progress after which a running job is considered abandoned and resumed.",
+        )
+        parser.add_argument("--worker", default=f"{socket.gethostname()}:{os.getpid()}", help="Worker name.")
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options["stale_after"])
+        self.stdout.write(f"Worker {options['worker']} waiting for import jobs...")
+
+        while True:
+            job = claim_import_job(options["worker"], stale_after=stale_after)
+            if job is None:
+                if options["burst"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Processing import job {job.pk} ({job.total_lines} lines)...")
+            job = run_import_job(job)
+            self.stdout.write(
+                f"Import job {job.pk} {job.status.lower()}: {job.imported_count} imported, {job.error_count} errors."
+            )
+
+        self.stdout.write("No queued import jobs left.")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from stuffs.models import BuiltSpecificationCount, Specification
+
+
+class Command(BaseCommand):
+    help = "Rebuild the built specification counts summary from scratch, or only verify it with --check"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report differences, don't rebuild.")
+
+    def handle(self, *args, **options):
+        expected = {row["code_number"]: row["built_count"] for row in Specification.reports.scan_built_count()}
+        stored = dict(
+            BuiltSpecificationCount.objects.filter(built_count__gt=0).values_list("code_number", "built_count")
+        )
+
+        drift = {
+            code_number: (stored.get(code_number, 0), expected.get(code_number, 0))
+            for code_number in expected.keys() | stored.keys()
+            if stored.get(code_number, 0) != expected.get(code_number, 0)
+        }
+        for code_number, (stored_count, expected_count) in sorted(drift.items()):
+            self.stdout.write(f"{code_number}: stored {stored_count}, expected {expected_count}")
+
+        if options["check"]:
+            if drift:
+                raise CommandError(f"{len(drift)} code numbers are out of date.")
+            self.stdout.write("Built specification counts are up to date.")
+            return
+
+        with transaction.atomic():
+            counts = BuiltSpecificationCount.objects.rebuild()
+        self.stdout.write(f"Rebuilt built specification counts for {len(counts)} code numbers.")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from stuffs.models import Specification
+
+
+class Command(BaseCommand):
+    help = "Recompute the component and missing part counters of the specifications, or only verify them with --check"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report differences, don't repair.")
+
+    def handle(self, *args, **options):
+        drifted = Specification.objects.drifted_counters().order_by("pk")
+        for specification in drifted.iterator(chunk_size=2000):
+            self.stdout.write(
+                f"{specification.pk}: stored {specification.component_count} components and "
+                f"{specification.missing_part_count} missing parts, expected {specification.actual_component_count} "
+                f"and {specification.actual_missing_part_count}"
+            )
+
+        if options["check"]:
+            if drifted.exists():
+                raise CommandError(f"{drifted.count()} specifications have out of date counters.")
+            self.stdout.write("Specification counters are up to date.")
+            return
+
+        with transaction.atomic():
+            repaired = Specification.objects.repair_counters()
+        self.stdout.write(f"Repaired the counters of {repaired} specifications.")
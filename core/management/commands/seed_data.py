@@ -1,24 +1,107 @@
-from random import sample
+from time import perf_counter
 
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
-from stuffs.factories import ComponentFactory, GroupFactory, SpecificationFactory
+from core.db import supports_copy
+from stuffs.models import Specification
+from stuffs.seeding import DatasetGenerator, delete_dataset, seed_dataset, seeded_before
+
+
+def parse_statuses(value):
+    """Parse ``"Built=3,Planning Phase=1"`` into a mapping of status to weight."""
+    statuses = {}
+    for item in value.split(","):
+        status, _, weight = item.partition("=")
+        status = status.strip()
+        if status not in Specification.STATUS:
+            raise CommandError(f"Unknown status: {status!r}.")
+        try:
+            statuses[status] = int(weight or 1)
+        except ValueError:
+            raise CommandError(f"Invalid weight of {status!r}: {weight!r}.")
+        if statuses[status] < 0:
+            raise CommandError(f"Invalid weight of {status!r}: {weight!r}.")
+
+    if not any(statuses.values()):
+        raise CommandError("Give at least one status a weight.")
+
+    return statuses
 
 
 class Command(BaseCommand):
-    help = "Seed the database with initial data"
+    help = "Seed the database with generated specifications, groups and components"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--specifications", type=int, default=10, help="Number of specifications.")
+        parser.add_argument("--groups-per-specification", type=int, default=5)
+        parser.add_argument("--components-per-group", type=int, default=18)
+        parser.add_argument(
+            "--ungrouped-components", type=int, default=10, help="Components without a group per specification."
+        )
+        parser.add_argument(
+            "--statuses",
+            type=parse_statuses,
+            help='Weights of the statuses, e.g. "Built=3,Planning Phase=1". All statuses equally by default.',
+        )
+        parser.add_argument(
+            "--missing-part-ratio", type=float, default=0.2, help="Share of the components without a part code."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="The same seed generates the same data.")
+        parser.add_argument("--workers", type=int, default=1, help="Processes writing in parallel (not on SQLite).")
+        parser.add_argument(
+            "--chunk-size", type=int, default=100, help="Specifications written per transaction and per task."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT when COPY is unavailable.")
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete every specification, group and component first, e.g. those of an earlier run.",
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options["missing_part_ratio"] <= 1:
+            raise CommandError("--missing-part-ratio must be between 0 and 1.")
+        if options["groups_per_specification"] * options["components_per_group"] + options["ungrouped_components"] < 1:
+            raise CommandError("Each specification needs at least one component.")
 
-    def handle(self, *args, **kwargs):
-        self.stdout.write("Seeding data...")
+        generator = DatasetGenerator.of_specifications(
+            options["specifications"],
+            groups_per_specification=options["groups_per_specification"],
+            components_per_group=options["components_per_group"],
+            ungrouped_components=options["ungrouped_components"],
+            statuses=options["statuses"],
+            missing_part_ratio=options["missing_part_ratio"],
+            seed=options["seed"],
+        )
+        if options["reset"]:
+            self.stdout.write(f"Deleted {delete_dataset()} specifications.")
+        elif seeded_before(generator):
+            raise CommandError(
+                "The database already holds seeded specifications, whose group names would be used twice. "
+                "Pass --reset to replace them."
+            )
 
-        specifications = SpecificationFactory.create_batch(10)
-        current_specification = specifications[-1]
+        self.stdout.write(
+            f"Seeding {generator.specification_count} specifications and {generator.components} components "
+            f"with {'COPY' if supports_copy() else 'bulk inserts'}..."
+        )
 
-        groups = GroupFactory.create_batch(10, specification=current_specification)
-        ComponentFactory.create_batch(10, group=sample(groups, 1)[0], specification=current_specification)
+        started = perf_counter()
+        rows = seed_dataset(
+            generator,
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            batch_size=options["batch_size"],
+        )
+        elapsed = perf_counter() - started
 
         User = get_user_model()
-        User.objects.create_superuser(username="admin", password="admin")
+        if not User.objects.filter(username="admin").exists():
+            User.objects.create_superuser(username="admin", password="admin")
 
-        self.stdout.write("Data seeded successfully.")
+        total = sum(rows.values())
+        self.stdout.write(
+            f"Seeded {rows['specifications']} specifications, {rows['groups']} groups and {rows['components']} "
+            f"components in {elapsed:.1f} s ({total / max(elapsed, 1e-9):,.0f} rows/s)."
+        )
@@ -0,0 +1,138 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+# Upper bounds of the request latency histogram, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteMetrics:
+    """Aggregated metrics of the requests of one ``(route, method, status)``."""
+
+    def __init__(self):
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.response_bytes = 0
+
+    def record(self, request_metrics):
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, request_metrics.duration)] += 1
+        self.latency_sum += request_metrics.duration
+        self.queries += request_metrics.queries
+        self.query_seconds += request_metrics.query_seconds
+        self.response_bytes += request_metrics.response_bytes
+
+
+class MetricsRegistry:
+    """In-process request metrics, rendered in the Prometheus text exposition format."""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self.lock = Lock()
+        self.routes = {}
+
+    def record(self, route, method, status, request_metrics):
+        with self.lock:
+            self.routes.setdefault((route, method, status), RouteMetrics()).record(request_metrics)
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+    def render(self):
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                "# HELP http_request_duration_seconds Latency of the requests.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for labels, metrics in routes:
+                cumulative = 0
+                for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), metrics.latency_buckets):
+                    cumulative += count
+                    lines.append(
+                        f"http_request_duration_seconds_bucket{{{format_labels(*labels, le=bound)}}} {cumulative}"
+                    )
+                lines.append(f"http_request_duration_seconds_sum{{{format_labels(*labels)}}} {metrics.latency_sum}")
+                lines.append(f"http_request_duration_seconds_count{{{format_labels(*labels)}}} {cumulative}")
+
+            for name, attribute, description in [
+                ("http_request_queries_total", "queries", "SQL queries run by the requests."),
+                ("http_request_query_seconds_total", "query_seconds", "Time spent in SQL queries by the requests."),
+                ("http_response_size_bytes_total", "response_bytes", "Size of the response bodies."),
+            ]:
+                lines.extend([f"# HELP {name} {description}", f"# TYPE {name} counter"])
+                lines.extend(
+                    f"{name}{{{format_labels(*labels)}}} {getattr(metrics, attribute)}" for labels, metrics in routes
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(route, method, status, **extra):
+    labels = {"route": route, "method": method, "status": status, **extra}
+    escaped = {
+        name: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for name, value in labels.items()
+    }
+
+    return ",".join(f'{name}="{value}"' for name, value in escaped.items())
+
+
+# The metrics of the request being handled; context variables follow it into sync_to_async() threads
+current_request_metrics = ContextVar("current_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Latency, SQL and response size of one request.
+
+    As an execute wrapper (``connection.execute_wrapper()``, or ``current_request_metrics`` with
+    ``record_query``), it counts the queries and the time spent running them.
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.response_bytes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_seconds += perf_counter() - started
+
+    def stop(self):
+        self.duration = perf_counter() - self.started
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.query_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f"total;dur={(perf_counter() - self.started) * 1000:.1f}"
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection, counting the query in the ``current_request_metrics``."""
+    request_metrics = current_request_metrics.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+
+    return request_metrics(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``record_query`` to the connection, once."""
+    if record_query not in connection.execute_wrappers:
+        # First, as execute_wrapper() removes the last wrapper when its block exits
+        connection.execute_wrappers.insert(0, record_query)
+
+
+registry = MetricsRegistry()
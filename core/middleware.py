@@ -0,0 +1,145 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import RequestMetrics, current_request_metrics, registry
+from .routers import replica_reads
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, SQL queries and response size of each request under its route, see ``core.metrics``.
+
+    The SQL and total time of the request are also sent in a ``Server-Timing`` header. Streamed responses
+    are recorded once they have been sent, with the queries they ran while streaming.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        request_metrics = RequestMetrics()
+        token = current_request_metrics.set(request_metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+
+        return self.process_response(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics = RequestMetrics()
+        token = current_request_metrics.set(request_metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+
+        return self.process_response(request, response, request_metrics)
+
+    def process_response(self, request, response, request_metrics):
+        response["Server-Timing"] = request_metrics.server_timing()
+        if response.streaming:
+            measured = self.ameasured if response.is_async else self.measured
+            response.streaming_content = measured(response.streaming_content, request, response, request_metrics)
+        else:
+            request_metrics.response_bytes = len(response.content)
+            self.record(request, response, request_metrics)
+
+        return response
+
+    def measured(self, content, request, response, request_metrics):
+        previous = current_request_metrics.get()
+        current_request_metrics.set(request_metrics)
+        try:
+            for chunk in content:
+                request_metrics.response_bytes += len(chunk)
+                yield chunk
+        finally:
+            current_request_metrics.set(previous)
+            self.record(request, response, request_metrics)
+
+    async def ameasured(self, content, request, response, request_metrics):
+        previous = current_request_metrics.get()
+        current_request_metrics.set(request_metrics)
+        try:
+            async for chunk in content:
+                request_metrics.response_bytes += len(chunk)
+                yield chunk
+        finally:
+            current_request_metrics.set(previous)
+            self.record(request, response, request_metrics)
+
+    def record(self, request, response, request_metrics):
+        request_metrics.stop()
+        route = request.resolver_match.view_name if request.resolver_match else "unresolved"
+        registry.record(route, request.method, response.status_code, request_metrics)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let the reads of safe requests go to the replicas, see ``core.routers.ReplicaRouter``.
+
+    Unsafe requests set a short-lived cookie, and the requests that carry it read from the primary, so a
+    client reads its own writes until the replicas have caught up with them.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = "use_primary"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def allows_replica_reads(self, request):
+        return request.method in SAFE_METHODS and self.cookie_name not in request.COOKIES
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = replica_reads.set(self.allows_replica_reads(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = replica_reads.set(self.allows_replica_reads(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.streaming and not response.is_async:
+            # Streamed responses query the database while they are sent, after the request has been handled
+            response.streaming_content = self.routed(response.streaming_content, self.allows_replica_reads(request))
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                self.cookie_name, "1", max_age=settings.DATABASE_REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax"
+            )
+
+        return response
+
+    def routed(self, content, allow_replica_reads):
+        previous = replica_reads.get()
+        replica_reads.set(allow_replica_reads)
+        try:
+            yield from content
+        finally:
+            replica_reads.set(previous)
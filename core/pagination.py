@@ -0,0 +1,157 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple("Cursor", ["reverse", "position"])
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque cursor pagination on ``(created, id)``.
+
+    The cursor holds the ordering values of the last row of the page, and the next page is fetched
+    with ``WHERE (created, id) < (...)`` on a composite index instead of ``COUNT(*)`` and ``OFFSET``,
+    so every page costs the same as the first one. The last ordering field must be unique.
+    """
+
+    ordering = ("-created", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset()`` for async views, fetching the page with the async ORM."""
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+
+        return self.set_page([item async for item in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """Return the queryset of the requested page plus one row, or ``None`` if pagination is off."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        queryset = queryset.order_by(*self.get_ordering_expressions(reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.cursor.position, reverse))
+
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        """Keep the rows of the page out of the rows fetched by ``get_page_queryset()`` and return them."""
+        reverse = self.cursor is not None and self.cursor.reverse
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else self.cursor is not None
+        if not self.page:
+            self.has_next = self.has_previous = False
+
+        if self.template is not None and (self.has_previous or self.has_next):
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering_expressions(self, reverse):
+        if not reverse:
+            return self.ordering
+
+        return [field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering]
+
+    def get_keyset_filter(self, position, reverse):
+        """
+        Build ``(a, b) < (x, y)`` as ``a <= x AND (a < x OR (a = x AND b < y))``.
+
+        The leading ``a <= x`` gives the database a range to start the index scan from.
+        """
+        comparisons = []
+        for field in self.ordering:
+            descending = field.startswith("-")
+            comparisons.append((field.lstrip("-"), "lt" if descending != reverse else "gt"))
+
+        keyset = Q()
+        for index, (field, lookup) in enumerate(comparisons):
+            equal_to_previous = {comparisons[i][0]: position[i] for i in range(index)}
+            keyset |= Q(**equal_to_previous, **{f"{field}__{lookup}": position[index]})
+
+        first_field, first_lookup = comparisons[0]
+        return Q(**{f"{first_field}__{first_lookup}e": position[0]}) & keyset
+
+    def get_position(self, item):
+        return tuple(
+            item[field.lstrip("-")] if isinstance(item, dict) else getattr(item, field.lstrip("-"))
+            for field in self.ordering
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        return self.encode_cursor(Cursor(reverse=False, position=self.get_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        return self.encode_cursor(Cursor(reverse=True, position=self.get_position(self.page[0])))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position = tuple(
+                self.to_python(field.lstrip("-"), value) for field, value in zip(self.ordering, data["p"], strict=True)
+            )
+            return Cursor(reverse=bool(data["r"]), position=position)
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, field, value):
+        """Parse the value of an ordering field read from a cursor."""
+        return self.model._meta.get_field(field).to_python(value)
+
+    def encode_cursor(self, cursor):
+        data = {
+            "r": int(cursor.reverse),
+            "p": [value.isoformat() if hasattr(value, "isoformat") else value for value in cursor.position],
+        }
+        encoded = urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode("ascii")
+
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+class RankedKeysetPagination(KeysetPagination):
+    """Keyset pagination on a ``rank`` annotation, best matches first."""
+
+    ordering = ("-rank", "-id")
+
+    def to_python(self, field, value):
+        if field == "rank":
+            return float(value)
+
+        return super().to_python(field, value)
@@ -0,0 +1,18 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON, one item per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        items = data if isinstance(data, list) else [data]
+        return "".join(f"{json.dumps(item)}\n" for item in items).encode(self.charset)
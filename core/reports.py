@@ -0,0 +1,153 @@
+import logging
+from itertools import groupby
+
+from django.core.cache import caches
+from django.db import models
+
+from .routers import use_primary
+
+logger = logging.getLogger(__name__)
+
+
+def sort_key(value):
+    # None sorts last instead of failing to compare with the other values
+    return (value is None, value)
+
+
+class Report:
+    """
+    A report declared as an aggregation: the rows of ``model`` grouped by ``dimensions`` and summed into ``measures``.
+
+    Both map a column name to an expression. Measures must be additive (``Count`` or ``Sum``, with an optional
+    ``filter``), so several reports over the same model can be rolled up from one grouped query. ``columns`` maps
+    more column names to a function of the row (a dict of the dimensions and measures), ``labels`` names the
+    header columns and ``ordering`` sorts the rows by column names, ``-`` first for descending.
+    """
+
+    def __init__(self, name, model, dimensions, measures, columns=None, labels=None, ordering=()):
+        for measure_name, measure in measures.items():
+            if not isinstance(measure, (models.Count, models.Sum)) or measure.distinct:
+                raise ValueError(f"The measure {measure_name} of {name} must be a Count or a Sum without distinct.")
+
+        self.name = name
+        self.model = model
+        self.dimensions = dimensions
+        self.measures = measures
+        self.columns = columns or {}
+        self.labels = labels or {}
+        self.ordering = ordering
+
+    @property
+    def header(self):
+        return [self.labels.get(name, name) for name in [*self.dimensions, *self.measures, *self.columns]]
+
+    def rows(self, totals):
+        """Turn the measures summed per dimensions key into the sorted rows of the report."""
+        rows = []
+        for key, values in totals.items():
+            row = dict(zip(self.dimensions, key))
+            row.update(zip(self.measures, values))
+            row.update((name, function(row)) for name, function in self.columns.items())
+            rows.append(row)
+
+        # Stable sorts, from the last ordering column to the first
+        for name in reversed(self.ordering):
+            descending = name.startswith("-")
+            rows.sort(key=lambda row: sort_key(row[name.lstrip("-")]), reverse=descending)
+
+        return [tuple(row.values()) for row in rows]
+
+
+class ReportEngine:
+    """
+    Compute reports, several at a time, and memoize them until the reported data changes.
+
+    The reports over the same model are computed together: a single query grouped by all their dimensions,
+    read once through a cursor and rolled up into each report. Results are cached for ``timeout`` seconds under
+    the collection version of ``versions``, which every write to the reported data drops. Unless the versions are
+    kept in a shared cache, writes from other processes (commands, workers) would go unseen, so nothing is memoized.
+    """
+
+    def __init__(self, reports, versions, alias="default", timeout=300):
+        self.reports = {report.name: report for report in reports}
+        self.versions = versions
+        self.alias = alias
+        self.timeout = timeout
+        self.warned = False
+
+    def key(self, name, version):
+        return f"report:{name}:{version}"
+
+    def compute(self, names):
+        """Map each of ``names`` to the rows of its report."""
+        reports = [self.reports[name] for name in names]
+        if not self.versions.shared:
+            if not self.warned:
+                logger.warning(
+                    "Reports are not memoized: the %r cache of their versions is not shared between processes.",
+                    self.versions.alias,
+                )
+                self.warned = True
+            return self.compute_all(reports)
+
+        version = self.versions.get_collection()
+        cache = caches[self.alias]
+
+        keys = {report.name: self.key(report.name, version) for report in reports}
+        cached = cache.get_many(keys.values())
+        results = {name: cached[key] for name, key in keys.items() if key in cached}
+        missing = [report for report in reports if report.name not in results]
+        if missing:
+            # Results are memoized, so they are computed from the primary, never from a lagging replica
+            use_primary()
+            results.update(self.compute_all(missing))
+            cache.set_many({keys[report.name]: results[report.name] for report in missing}, self.timeout)
+
+        return {report.name: results[report.name] for report in reports}
+
+    def compute_all(self, reports):
+        """Compute ``reports``, one query per model."""
+        results = {}
+        by_model = groupby(
+            sorted(reports, key=lambda report: report.model._meta.label), key=lambda report: report.model
+        )
+        for model, model_reports in by_model:
+            results.update(self.aggregate(model, list(model_reports)))
+
+        return results
+
+    def aggregate(self, model, reports):
+        """Compute ``reports`` of ``model`` in one pass over one grouped query."""
+        dimensions, measures, plans = {}, {}, []
+        for report in reports:
+            dimension_aliases = []
+            for expression in report.dimensions.values():
+                # Dimensions shared by several reports are grouped by once
+                alias = next((alias for alias, other in dimensions.items() if other == expression), None)
+                if alias is None:
+                    alias = f"dimension_{len(dimensions)}"
+                    dimensions[alias] = expression
+                dimension_aliases.append(alias)
+
+            measure_aliases = []
+            for expression in report.measures.values():
+                alias = f"measure_{len(measures)}"
+                measures[alias] = expression
+                measure_aliases.append(alias)
+
+            plans.append((report, dimension_aliases, measure_aliases, {}))
+
+        queryset = model._default_manager.order_by()
+        if dimensions:
+            rows = queryset.values(**dimensions).annotate(**measures).iterator(chunk_size=5000)
+        else:
+            rows = [queryset.aggregate(**measures)]
+
+        for row in rows:
+            for _, dimension_aliases, measure_aliases, totals in plans:
+                key = tuple(row[alias] for alias in dimension_aliases)
+                values = totals.setdefault(key, [0] * len(measure_aliases))
+                for index, alias in enumerate(measure_aliases):
+                    values[index] += row[alias] or 0
+
+        return {report.name: report.rows(totals) for report, _, _, totals in plans}
@@ -0,0 +1,43 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Whether the reads of the current request may go to a replica, set by core.middleware.ReplicaRoutingMiddleware
+replica_reads = ContextVar("replica_reads", default=False)
+
+
+def use_primary():
+    """
+    Read from the primary for the rest of the request.
+
+    Needed before caching what is read under a version bumped on write: a lagging replica would
+    store the previous state under the new version.
+    """
+    replica_reads.set(False)
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random database of ``DATABASE_REPLICAS`` while ``replica_reads`` allows it.
+
+    Everything else goes to ``default``. The first write switches the rest of the request back to ``default``,
+    so it reads what it wrote.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replica_reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        replica_reads.set(False)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        return db not in settings.DATABASE_REPLICAS
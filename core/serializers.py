@@ -0,0 +1,75 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import HyperlinkedIdentityField, HyperlinkedRelatedField, ManyRelatedField, RelatedField
+
+from .relations import CachedHyperlinkedIdentityField, CachedHyperlinkedRelatedField
+
+
+class CachedHyperlinkedModelSerializer(serializers.HyperlinkedModelSerializer):
+    """``HyperlinkedModelSerializer`` whose ``url`` and related hyperlinks don't call ``reverse()`` per object."""
+
+    serializer_related_field = CachedHyperlinkedRelatedField
+    serializer_url_field = CachedHyperlinkedIdentityField
+
+
+def stock_hyperlinked_serializer(serializer_class):
+    """``serializer_class`` with the stock DRF hyperlink fields, to check or benchmark the cached ones against."""
+
+    class StockSerializer(serializer_class):
+        serializer_related_field = HyperlinkedRelatedField
+        serializer_url_field = HyperlinkedIdentityField
+
+        class Meta(serializer_class.Meta):
+            pass
+
+    return StockSerializer
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Model serializer accepting ``fields``, the names of the only fields it renders.
+
+    ``id`` can be requested even when the serializer doesn't declare it. When every requested field reads a
+    plain column, the serializer can also render the dicts of ``QuerySet.values(*get_values_columns())``.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        self.requested_fields = fields
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.requested_fields is None:
+            return fields
+
+        if "id" not in fields:
+            fields = {"id": serializers.ReadOnlyField(), **fields}
+
+        return {name: field for name, field in fields.items() if name in self.requested_fields}
+
+    def get_values_columns(self):
+        """Return the columns the readable fields are read from, or ``None`` if one isn't a plain column."""
+        columns = []
+        for field in self._readable_fields:
+            if isinstance(field, (RelatedField, ManyRelatedField, serializers.BaseSerializer)):
+                return None
+            try:
+                model_field = self.Meta.model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if model_field.is_relation or not model_field.concrete:
+                return None
+            columns.append(field.source)
+
+        return columns
+
+    def to_representation(self, instance):
+        if not isinstance(instance, dict):
+            return super().to_representation(instance)
+
+        return {
+            field.field_name: None
+            if instance[field.source] is None
+            else field.to_representation(instance[field.source])
+            for field in self._readable_fields
+        }
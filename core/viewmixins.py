@@ -1,5 +1,15 @@
-from django.core.exceptions import ImproperlyConfigured
+from hashlib import md5
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import exceptions, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .routers import use_primary
 
 
 class NestedObjectMixin:
@@ -18,3 +28,219 @@ class NestedObjectMixin:
     @property
     def look_up_field_value(self):
         return self.kwargs[self.parent_object_lookup_field]
+
+
+class AtomicActionsMixin:
+    """
+    Run the actions of unsafe methods in a transaction, except the ones listed in ``non_atomic_actions``.
+
+    Reads run in autocommit and hold no transaction open while they serialize or stream. The listed actions
+    declare their own transaction boundaries, e.g. to validate a large payload before opening one, or to
+    commit a long import in chunks.
+    """
+
+    non_atomic_actions = ()
+    atomic = False
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS or self.action_map.get(request.method.lower()) in self.non_atomic_actions:
+            return super().dispatch(request, *args, **kwargs)
+
+        with transaction.atomic():
+            self.atomic = True
+            return super().dispatch(request, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        response = super().handle_exception(exc)
+        # DRF only rolls back under ATOMIC_REQUESTS; an error response must not commit a partial write either
+        if self.atomic:
+            transaction.set_rollback(True)
+
+        return response
+
+
+class SparseFieldsetMixin:
+    """
+    Limit the ``list`` output to the comma separated fields of the ``fields`` query parameter.
+
+    The serializer must use ``core.serializers.SparseFieldsetSerializerMixin``. When every requested field
+    reads a plain column, the rows are read with ``values()`` and never become model instances.
+    """
+
+    fields_query_param = "fields"
+    requested_fields = None
+
+    def get_requested_fields(self):
+        """Return the requested field names, or ``None`` if the response isn't limited."""
+        if self.action != "list" or self.fields_query_param not in self.request.query_params:
+            return None
+
+        names = self.request.query_params[self.fields_query_param].split(",")
+        fields = list(dict.fromkeys(name.strip() for name in names if name.strip()))
+        available = {"id", *self.get_serializer_class()(context=self.get_serializer_context()).fields}
+        unknown = [name for name in fields if name not in available]
+        if not fields:
+            raise exceptions.ValidationError({self.fields_query_param: ["Specify at least one field."]})
+        if unknown:
+            raise exceptions.ValidationError({self.fields_query_param: [f"Unknown fields: {', '.join(unknown)}."]})
+
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.requested_fields is not None:
+            kwargs.setdefault("fields", self.requested_fields)
+
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.requested_fields is None:
+            return queryset
+
+        serializer = self.get_serializer_class()(context=self.get_serializer_context(), fields=self.requested_fields)
+        columns = serializer.get_values_columns()
+        if columns is None:
+            return queryset
+
+        # The paginator reads its position from the ordering columns of the last row
+        ordering = [field.lstrip("-") for field in getattr(self.paginator, "ordering", ())]
+        return queryset.prefetch_related(None).values(*dict.fromkeys([*columns, *ordering]))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.requested_fields = self.get_requested_fields()
+
+
+class VersionedCacheMixin:
+    """
+    Serve the ``cached_actions`` from a cache, keyed on the version of the object they render.
+
+    ``cache_versions`` is the ``core.cache.VersionRegistry`` of that object and must be bumped on every
+    write to it, so a cached response is never stale and a hit doesn't touch the database.
+    """
+
+    cache_versions = None
+    cached_actions = ("list", "retrieve")
+    cache_lookup_url_kwarg = None
+
+    def get_cache_object_pk(self):
+        """Return the primary key of the rendered object, or ``None`` if the URL doesn't hold a valid one."""
+        lookup_url_kwarg = self.cache_lookup_url_kwarg or self.lookup_url_kwarg or self.lookup_field
+        try:
+            return self.cache_versions.model._meta.pk.to_python(self.kwargs.get(lookup_url_kwarg))
+        except ValidationError:
+            return None
+
+    def get_cache_key(self, request, pk):
+        version = self.cache_versions.get(pk)
+        url = md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+
+        return f"response:{self.basename}:{self.action}:{pk}:{version}:{url}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        pk = self.get_cache_object_pk() if self.action in self.cached_actions else None
+        if pk is None:
+            return handler(request, *args, **kwargs)
+
+        cache = self.cache_versions.cache
+        key = self.get_cache_key(request, pk)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        use_primary()
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data)
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalResponse(Exception):
+    """Short-circuit the handler with the ``304``/``412`` response of a conditional request."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalRequestMixin:
+    """
+    Honour ``If-None-Match``/``If-Modified-Since`` on reads and ``If-Match``/``If-Unmodified-Since`` on writes.
+
+    ``get_validator()`` describes the state of the resource with a cheap query, e.g. the latest ``modified``
+    and the number of rows. The preconditions are evaluated in ``initial()``, so ``304 Not Modified`` and
+    ``412 Precondition Failed`` are returned before the handler or the serializer runs.
+    """
+
+    conditional_actions = ("list", "retrieve", "update", "partial_update", "destroy")
+    resource_validator = None
+
+    def get_validator(self, lock=False):
+        """
+        Return ``(last_modified, state)`` for the resource, or ``None`` if it doesn't exist.
+
+        ``last_modified`` may be ``None`` when it can't reflect every change of the resource, e.g. the deletion
+        of rows of a list; then only the ``ETag`` is sent and honoured.
+
+        With ``lock`` the rows the state is read from must stay locked until the end of the transaction,
+        so that concurrent writers checking the same ``If-Match`` are serialized.
+        """
+        raise NotImplementedError("`get_validator()` must be implemented.")
+
+    def get_etag(self, validator):
+        _, state = validator
+        representation = f"{state!r}:{self.request.build_absolute_uri()}:{self.request.accepted_media_type}"
+
+        return quote_etag(md5(representation.encode(), usedforsecurity=False).hexdigest())
+
+    def set_validator_headers(self, response, validator):
+        last_modified, _ = validator
+        response["ETag"] = self.get_etag(validator)
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if self.action not in self.conditional_actions:
+            return
+
+        self.resource_validator = self.get_validator(lock=request.method not in SAFE_METHODS)
+        if self.resource_validator is None:
+            return
+
+        last_modified, _ = self.resource_validator
+        response = get_conditional_response(
+            request,
+            etag=self.get_etag(self.resource_validator),
+            last_modified=last_modified and int(last_modified.timestamp()),
+        )
+        if response is not None:
+            raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        if self.action not in self.conditional_actions or request.method not in ("GET", "HEAD", "PUT", "PATCH"):
+            return response
+
+        validator = self.resource_validator
+        if request.method in ("PUT", "PATCH") and response.status_code == status.HTTP_200_OK:
+            # The resource changed, clients need the new validator for their next If-Match
+            validator = self.get_validator()
+        if validator is not None and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            self.set_validator_headers(response, validator)
+
+        return response
@@ -0,0 +1,8 @@
+from django.http import HttpResponse
+
+from .metrics import registry
+
+
+def metrics(request):
+    """Request metrics of this process in the Prometheus text format."""
+    return HttpResponse(registry.render(), content_type=registry.content_type)
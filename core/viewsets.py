@@ -9,3 +9,11 @@ class RetrieveUpdateDestroyViewset(
     mixins.RetrieveModelMixin, mixins.UpdateModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet
 ):
     pass
+
+
+class RetrieveViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    pass
+
+
+class ListViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    pass
@@ -1,5 +1,5 @@
 from django.contrib import admin
 
-from .models import Component, Group, Specification
+from .models import Component, Group, ImportJob, Specification
 
-admin.site.register([Component, Group, Specification])
+admin.site.register([Component, Group, ImportJob, Specification])
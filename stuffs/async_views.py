@@ -0,0 +1,43 @@
+from django.db.models import Prefetch
+
+from core.async_views import AsyncDetailView, AsyncListView
+
+from .models import Component, Group, Specification
+from .serializers import ComponentSerializer, GroupSerializer, SpecificationSerializer
+
+
+class SpecificationListView(AsyncListView):
+    queryset = Specification.objects.prefetch_related(
+        Prefetch("groups", queryset=Group.objects.only("name", "specification")),
+        Prefetch("components", queryset=Component.objects.only("name", "specification")),
+    )
+    serializer_class = SpecificationSerializer
+
+
+class SpecificationDetailView(AsyncDetailView):
+    queryset = SpecificationListView.queryset
+    serializer_class = SpecificationSerializer
+
+
+class BaseNestedSpecificationListView(AsyncListView):
+    async def get_queryset(self, specification_pk):
+        if not await Specification.objects.filter(pk=specification_pk).aexists():
+            return None
+
+        return self.get_specification_queryset(specification_pk)
+
+
+class SpecificationGroupListView(BaseNestedSpecificationListView):
+    serializer_class = GroupSerializer
+
+    def get_specification_queryset(self, specification_pk):
+        return Group.objects.filter(specification_id=specification_pk).prefetch_related(
+            Prefetch("components", queryset=Component.objects.only("name", "group"))
+        )
+
+
+class SpecificationComponentListView(BaseNestedSpecificationListView):
+    serializer_class = ComponentSerializer
+
+    def get_specification_queryset(self, specification_pk):
+        return Component.objects.filter(specification_id=specification_pk)
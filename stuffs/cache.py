@@ -0,0 +1,6 @@
+from core.cache import VersionRegistry
+
+from .models import Specification
+
+# Bumped on every write to a specification or to one of its groups and components
+specification_versions = VersionRegistry(Specification, alias="specifications")
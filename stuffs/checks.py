@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core import checks
+
+from .cache import specification_versions
+
+
+@checks.register(checks.Tags.caches)
+def check_specification_cache(app_configs, **kwargs):
+    """Warn when the specification versions can't be seen by the other processes of a deployment."""
+    if settings.DEBUG or not specification_versions.process_local:
+        return []
+
+    return [
+        checks.Warning(
+            f"The {specification_versions.alias!r} cache is local to each process.",
+            hint=(
+                "Writes from the other workers and commands won't invalidate this process's cached responses. "
+                "Set SPECIFICATION_CACHE_URL to a shared cache, e.g. redis://, or leave it unset to disable the cache."
+            ),
+            id="stuffs.W001",
+        )
+    ]
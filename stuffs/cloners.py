@@ -0,0 +1,134 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import specification_versions
+from .importers import chunked
+from .models import Component, Group, Specification
+
+
+def values_placeholders(rows):
+    """Placeholders for a ``VALUES`` list of ``rows``, e.g. ``(%s, %s), (%s, %s)``."""
+    return ", ".join([f"({', '.join(['%s'] * len(rows[0]))})"] * len(rows))
+
+
+class SpecificationCloner:
+    """
+    Clone specifications with a handful of set-based statements.
+
+    The groups are copied with one bulk insert, which gives an old-to-new group id mapping, and the
+    components with ``INSERT ... SELECT`` statements that join that mapping, however many there are.
+    """
+
+    # Keeps the group mapping of each INSERT ... SELECT well under the database parameter limits
+    group_batch_size = 5000
+
+    def clone(self, specification, include_parts=False):
+        return self.clone_many([(specification, include_parts)])[0]
+
+    @transaction.atomic
+    def clone_many(self, sources):
+        """Clone each ``(specification, include_parts)`` pair and return the clones in the same order."""
+        now = timezone.now()
+
+        clones = Specification.objects.bulk_create(
+            [
+                Specification(
+                    name=specification.name,
+                    code_number=specification.code_number,
+                    completed=specification.completed,
+                    status="Design Phase" if include_parts else "Planning Phase",
+                    component_count=specification.component_count,
+                    missing_part_count=(
+                        specification.missing_part_count if include_parts else specification.component_count
+                    ),
+                    created=now,
+                    modified=now,
+                    status_changed=now,
+                )
+                for specification, include_parts in sources
+            ]
+        )
+        clone_map = [
+            (specification.pk, clone.pk, include_parts)
+            for (specification, include_parts), clone in zip(sources, clones)
+        ]
+
+        group_map = self.clone_groups(clone_map, now)
+        self.clone_components(clone_map, None, now)
+        for group_map_batch in chunked(group_map, self.group_batch_size):
+            self.clone_components(clone_map, group_map_batch, now)
+
+        specification_versions.bump(clone.pk for clone in clones)
+
+        return clones
+
+    def clone_groups(self, clone_map, now):
+        """Copy the groups of every source and return ``(old_group_id, clone_id, new_group_id)`` triples."""
+        source_ids = {source_id for source_id, _, _ in clone_map}
+        groups_by_specification = {}
+        for group in Group.objects.filter(specification_id__in=source_ids).order_by("id"):
+            groups_by_specification.setdefault(group.specification_id, []).append(group)
+
+        old_ids, cloned_groups = [], []
+        for source_id, clone_id, _ in clone_map:
+            for group in groups_by_specification.get(source_id, []):
+                old_ids.append(group.pk)
+                cloned_groups.append(
+                    Group(
+                        name=group.name,
+                        group_code=group.group_code,
+                        specification_id=clone_id,
+                        created=now,
+                        modified=now,
+                    )
+                )
+
+        Group.objects.bulk_create(cloned_groups)
+
+        return [(old_id, group.specification_id, group.pk) for old_id, group in zip(old_ids, cloned_groups)]
+
+    def clone_components(self, clone_map, group_map, now):
+        """
+        Copy, in one ``INSERT ... SELECT``, the components whose group is in ``group_map``.
+
+        With ``group_map=None`` the components that belong to no group are copied instead.
+        """
+        qn = connection.ops.quote_name
+        component_table, specification_column, group_column = (
+            qn(Component._meta.db_table),
+            qn(Component._meta.get_field("specification").column),
+            qn(Component._meta.get_field("group").column),
+        )
+
+        ctes = [f"clone_map (source_id, clone_id, include_parts) AS (VALUES {values_placeholders(clone_map)})"]
+        params = [value for row in clone_map for value in row]
+        if group_map is None:
+            group_join, new_group_id = f"WHERE component.{group_column} IS NULL", "NULL"
+        else:
+            ctes.append(f"group_map (old_id, clone_id, new_id) AS (VALUES {values_placeholders(group_map)})")
+            params += [value for row in group_map for value in row]
+            group_join = (
+                "INNER JOIN group_map ON group_map.clone_id = clone_map.clone_id "
+                f"AND group_map.old_id = component.{group_column}"
+            )
+            new_group_id = "group_map.new_id"
+
+        sql = f"""
+            WITH {", ".join(ctes)}
+            INSERT INTO {component_table} (
+                {qn("created")}, {qn("modified")}, {qn("name")}, {qn("description")}, {qn("part_code")},
+                {specification_column}, {group_column}
+            )
+            SELECT
+                %s, %s, component.{qn("name")}, component.{qn("description")},
+                CASE WHEN clone_map.include_parts THEN component.{qn("part_code")} ELSE NULL END,
+                clone_map.clone_id, {new_group_id}
+            FROM {component_table} component
+            INNER JOIN clone_map ON clone_map.source_id = component.{specification_column}
+            {group_join}
+            ORDER BY component.{qn("id")}
+        """
+        params += [connection.ops.adapt_datetimefield_value(now)] * 2
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
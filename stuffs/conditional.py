@@ -0,0 +1,77 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, OuterRef, Subquery
+
+from core.routers import use_primary
+
+from .cache import specification_versions
+from .models import Component, Group, Specification
+
+
+def related_state(queryset, field):
+    """Subqueries for the latest ``modified`` and the number of rows of ``queryset`` pointing at the outer row."""
+    rows = queryset.filter(**{field: OuterRef("pk")}).order_by().values(field)
+
+    return {
+        f"{queryset.model._meta.model_name}_latest_modified": Subquery(
+            rows.annotate(value=Max("modified")).values("value")
+        ),
+        f"{queryset.model._meta.model_name}_rows": Subquery(rows.annotate(value=Count("pk")).values("value")),
+    }
+
+
+def validator(model, pk, lock=False, **subqueries):
+    """
+    Read the ``modified`` of a row and the ``subqueries`` in one query, as a ``(last_modified, state)`` pair.
+
+    Returns ``None`` if the row doesn't exist. Deleting a related row doesn't change any ``modified``, so with
+    ``subqueries`` there is no ``last_modified``: only the ETag, which includes the row counts, is reliable.
+    """
+    try:
+        pk = model._meta.pk.to_python(pk)
+    except ValidationError:
+        return None
+
+    queryset = model.objects.filter(pk=pk).annotate(**subqueries)
+    if lock:
+        queryset = queryset.select_for_update(of=("self",))
+
+    state = queryset.values_list("modified", *subqueries).first()
+    if state is None:
+        return None
+
+    return (None if subqueries else state[0]), state
+
+
+def specification_tree_validator(pk, lock=False):
+    """Validator of a specification and all of its groups and components."""
+    return validator(
+        Specification,
+        pk,
+        lock,
+        **related_state(Group.objects.all(), "specification"),
+        **related_state(Component.objects.all(), "specification"),
+    )
+
+
+def cached_specification_tree_validator(pk):
+    """``specification_tree_validator`` cached under the version of the specification."""
+    cache = specification_versions.cache
+    key = f"validator:{pk}:{specification_versions.get(pk)}"
+
+    tree_validator = cache.get(key)
+    if tree_validator is None:
+        use_primary()
+        tree_validator = specification_tree_validator(pk)
+        if tree_validator is not None:
+            cache.set(key, tree_validator)
+
+    return tree_validator
+
+
+def group_validator(pk, lock=False):
+    """Validator of a group and its components."""
+    return validator(Group, pk, lock, **related_state(Component.objects.all(), "group"))
+
+
+def component_validator(pk, lock=False):
+    return validator(Component, pk, lock)
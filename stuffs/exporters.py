@@ -0,0 +1,84 @@
+import json
+
+from .models import Component, Group, Specification
+
+SPECIFICATION_FIELDS = ("name", "code_number", "completed", "status")
+GROUP_FIELDS = ("name", "group_code")
+COMPONENT_FIELDS = ("name", "description", "part_code")
+
+
+class SpecificationTreeExporter:
+    """
+    Yield specification trees in the shape ``SpecificationImportSerializer`` accepts.
+
+    Specifications are read ``chunk_size`` at a time by id, and each chunk costs three queries
+    (specifications, groups, components) however many objects it holds. The queries run in autocommit, so
+    components are only exported under the groups already read, never as ungrouped ones of a newer group.
+    """
+
+    def __init__(self, queryset=None, chunk_size=500):
+        self.queryset = Specification.objects.all() if queryset is None else queryset
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk
+
+    def chunks(self):
+        last_id = 0
+        while True:
+            specifications = list(
+                self.queryset.filter(id__gt=last_id)
+                .order_by("id")
+                .values("id", *SPECIFICATION_FIELDS)[: self.chunk_size]
+            )
+            if not specifications:
+                return
+
+            last_id = specifications[-1]["id"]
+            yield self.build_trees(specifications)
+
+    def build_trees(self, specifications):
+        specification_ids = [spec_data["id"] for spec_data in specifications]
+        trees = {spec_data.pop("id"): {**spec_data, "groups": [], "components": []} for spec_data in specifications}
+
+        groups = {}
+        for group_data in (
+            Group.objects.filter(specification_id__in=specification_ids)
+            .order_by("id")
+            .values("id", "specification_id", *GROUP_FIELDS)
+        ):
+            group_id, specification_id = group_data.pop("id"), group_data.pop("specification_id")
+            groups[group_id] = {**group_data, "components": []}
+            trees[specification_id]["groups"].append(groups[group_id])
+
+        for component_data in (
+            Component.objects.filter(specification_id__in=specification_ids)
+            .order_by("id")
+            .values("group_id", "specification_id", *COMPONENT_FIELDS)
+        ):
+            group_id, specification_id = component_data.pop("group_id"), component_data.pop("specification_id")
+            if group_id is None:
+                trees[specification_id]["components"].append(component_data)
+            elif group_id in groups:
+                groups[group_id]["components"].append(component_data)
+            # Otherwise the group was created after the groups were read: both are left to the next export
+
+        return list(trees.values())
+
+
+def json_export(chunks):
+    """Stream chunks of trees as the ``{"specifications": [...]}`` document ``import_data`` accepts."""
+    yield '{"specifications": ['
+    separator = ""
+    for chunk in chunks:
+        for tree in chunk:
+            yield f"{separator}{json.dumps(tree)}"
+            separator = ","
+    yield "]}"
+
+
+def ndjson_export(chunks):
+    """Stream chunks of trees one tree per line, as ``import_stream`` accepts them."""
+    for chunk in chunks:
+        yield "".join(f"{json.dumps(tree)}\n" for tree in chunk)
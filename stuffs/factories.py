@@ -20,7 +20,8 @@ class GroupFactory(DjangoModelFactory):
     class Meta:
         model = Group
 
-    name = factory.Faker("word")
+    # Group names can't be shared between specifications, so random words would make imports of the data flaky
+    name = factory.Sequence(lambda number: f"Group {number}")
     group_code = factory.Faker("ean8")
     specification = factory.SubFactory(SpecificationFactory)
 
@@ -0,0 +1,495 @@
+import json
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, models, transaction
+
+from core.db import copy_rows, supports_copy
+
+from .cache import specification_versions
+from .exporters import COMPONENT_FIELDS, GROUP_FIELDS, SPECIFICATION_FIELDS
+from .models import BuiltSpecificationCount, Component, Group, Specification
+
+
+def group_name_error(name, repeated=False):
+    if repeated:
+        return f"The group name '{name}' is used by more than one group of the specification."
+
+    return f"The group name '{name}' is already in use by another specification."
+
+
+def group_name_conflicts(specifications_data):
+    """
+    Map the index of each specification to the errors of the group names it cannot use.
+
+    A name is taken when a group of another specification already uses it, either in the
+    database or earlier in the same payload, and a specification can't use a name twice.
+    The database is checked with a single query.
+    """
+    names_by_index = {
+        index: Counter(group_data["name"] for group_data in spec_data.get("groups", []))
+        for index, spec_data in enumerate(specifications_data)
+    }
+    incoming_names = set().union(*names_by_index.values())
+    taken_names = set(
+        Group.objects.filter(name__in=incoming_names).values_list("name", flat=True).order_by().distinct()
+    )
+
+    owners = {}
+    conflicts = {}
+    for index, names in names_by_index.items():
+        for name in sorted(names):
+            if name in taken_names or owners.setdefault(name, index) != index:
+                conflicts.setdefault(index, []).append(group_name_error(name))
+            elif names[name] > 1:
+                conflicts.setdefault(index, []).append(group_name_error(name, repeated=True))
+
+    return conflicts
+
+
+class SpecificationImporter:
+    """Persist validated specification trees with one ``bulk_create`` per model."""
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size
+
+    def build(self, specifications_data):
+        """Build unsaved specifications, groups and components wired to each other."""
+        specifications, groups, components = [], [], []
+
+        for spec_data in specifications_data:
+            spec_data = dict(spec_data)
+            groups_data = spec_data.pop("groups", [])
+            ungrouped_components_data = spec_data.pop("components", [])
+
+            specification = Specification(**spec_data)
+            specifications.append(specification)
+            components.extend(
+                Component(**{**component_data, "group": None, "specification": specification})
+                for component_data in ungrouped_components_data
+            )
+
+            for group_data in groups_data:
+                group_data = dict(group_data)
+                components_data = group_data.pop("components", [])
+
+                group = Group(**{**group_data, "specification": specification})
+                groups.append(group)
+                components.extend(
+                    Component(**{**component_data, "group": group, "specification": specification})
+                    for component_data in components_data
+                )
+
+        for component in components:
+            component.specification.component_count += 1
+            component.specification.missing_part_count += component.missing_part
+
+        return specifications, groups, components
+
+    @transaction.atomic
+    def save(self, specifications_data):
+        """Create the specification trees and return the created specifications."""
+        specifications, groups, components = self.build(specifications_data)
+
+        Specification.objects.bulk_create(specifications, batch_size=self.batch_size)
+        Group.objects.bulk_create(groups, batch_size=self.batch_size)
+        Component.objects.bulk_create(components, batch_size=self.batch_size)
+
+        # bulk_create sends no signals, so the summary and the cache versions are updated here
+        BuiltSpecificationCount.objects.add(
+            Counter(spec.code_number for spec in specifications if spec.status == Specification.STATUS.Built)
+        )
+        specification_versions.bump(spec.pk for spec in specifications)
+
+        return specifications
+
+
+def chunked(iterable, size):
+    """Yield lists of at most ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def numbered_lines(lines):
+    """Yield ``(line_number, line)`` for the non-blank lines, numbered from 1."""
+    return ((number, line) for number, line in enumerate(lines, start=1) if line.strip())
+
+
+class ChunkedSpecificationImport:
+    """
+    Import newline-delimited JSON, one specification tree per line.
+
+    Lines are validated and committed ``chunk_size`` at a time, so memory only holds one chunk.
+    Invalid lines are reported with their line number and skipped; the rest of their chunk is imported.
+    Only the first ``max_errors`` errors are kept, ``error_count`` counts all of them.
+    """
+
+    def __init__(self, serializer_class, chunk_size, importer=None, max_errors=None):
+        self.serializer_class = serializer_class
+        self.chunk_size = chunk_size
+        self.importer = importer or SpecificationImporter()
+        self.max_errors = settings.SPECIFICATION_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+        self.lines = 0
+        self.imported = 0
+        self.errors = []
+        self.error_count = 0
+
+    def run(self, lines):
+        for chunk in chunked(numbered_lines(lines), self.chunk_size):
+            self.import_chunk(chunk)
+
+        return self
+
+    def import_chunk(self, chunk):
+        line_numbers, specifications_data = [], []
+
+        for number, line in chunk:
+            self.lines += 1
+            try:
+                data = json.loads(line)
+            except ValueError as exc:
+                self.add_error(number, {"non_field_errors": [f"Invalid JSON: {exc}"]})
+                continue
+
+            serializer = self.serializer_class(data=data)
+            if serializer.is_valid():
+                line_numbers.append(number)
+                specifications_data.append(serializer.validated_data)
+            else:
+                self.add_error(number, serializer.errors)
+
+        conflicts = group_name_conflicts(specifications_data)
+        for index, errors in conflicts.items():
+            self.add_error(line_numbers[index], {"groups": errors})
+
+        valid_data = [data for index, data in enumerate(specifications_data) if index not in conflicts]
+        if valid_data:
+            self.imported += len(self.importer.save(valid_data))
+
+    def add_error(self, line_number, errors):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_number, "errors": errors})
+
+
+def clean_value(field, value):
+    """Check ``value`` against the constraints of the model ``field`` and return it, or raise ``ValueError``."""
+    if value is None:
+        if field.null:
+            return None
+        raise ValueError("This field may not be null.")
+
+    if isinstance(field, models.BooleanField):
+        if not isinstance(value, bool):
+            raise ValueError("Must be a valid boolean.")
+        return value
+
+    if not isinstance(value, str):
+        raise ValueError("Not a valid string.")
+    value = value.strip()
+    if not value and not field.blank:
+        raise ValueError("This field may not be blank.")
+    if field.max_length is not None and len(value) > field.max_length:
+        raise ValueError(f"Ensure this field has no more than {field.max_length} characters.")
+    if field.choices and value not in dict(field.flatchoices):
+        raise ValueError(f'"{value}" is not a valid choice.')
+
+    return value
+
+
+class TreeValidator:
+    """
+    Validate specification trees with the field checks of ``SpecificationImportExportSerializer``.
+
+    The constraints (required, null, blank, length, choices) are read from the model fields and applied
+    to plain dicts, which is several times cheaper than a serializer per tree. Errors are keyed by their
+    path, e.g. ``groups.0.components.1.name``. Group names are left to the caller.
+    """
+
+    def __init__(self):
+        self.fields = {
+            model: [model._meta.get_field(name) for name in names]
+            for model, names in [
+                (Specification, SPECIFICATION_FIELDS),
+                (Group, GROUP_FIELDS),
+                (Component, COMPONENT_FIELDS),
+            ]
+        }
+
+    def validate(self, tree):
+        """Return the cleaned tree and a dict of errors, empty when it is valid."""
+        errors = {}
+        if not isinstance(tree, dict):
+            return None, {"non_field_errors": ["Invalid data. Expected a dictionary."]}
+
+        data = self.clean(Specification, tree, "", errors)
+        data["groups"] = []
+        for index, group_tree in self.items(tree, "groups", "", errors):
+            group_data = self.clean(Group, group_tree, f"groups.{index}.", errors)
+            group_data["components"] = [
+                self.clean(Component, component_tree, f"groups.{index}.components.{number}.", errors)
+                for number, component_tree in self.items(
+                    group_tree, "components", f"groups.{index}.", errors, required=True
+                )
+            ]
+            data["groups"].append(group_data)
+        data["components"] = [
+            self.clean(Component, component_tree, f"components.{number}.", errors)
+            for number, component_tree in self.items(tree, "components", "", errors)
+        ]
+
+        if data.get("completed") and any(
+            not component_data.get("part_code")
+            for components in [data["components"], *(group_data["components"] for group_data in data["groups"])]
+            for component_data in components
+        ):
+            errors["completed"] = ["Cannot complete a specification if any component is missing a part."]
+
+        return data, errors
+
+    def clean(self, model, values, prefix, errors):
+        data = {}
+        for field in self.fields[model]:
+            if field.name in values:
+                try:
+                    data[field.name] = clean_value(field, values[field.name])
+                except ValueError as exc:
+                    errors[f"{prefix}{field.name}"] = [str(exc)]
+            elif field.has_default() or field.blank or field.null:
+                data[field.name] = field.get_default()
+            else:
+                errors[f"{prefix}{field.name}"] = ["This field is required."]
+
+        return data
+
+    def items(self, values, key, prefix, errors, required=False):
+        """``(index, item)`` of the list of dicts under ``key``; other values are reported and skipped."""
+        if key not in values:
+            if required:
+                errors[f"{prefix}{key}"] = ["This field is required."]
+            return []
+        if not isinstance(values[key], list):
+            errors[f"{prefix}{key}"] = [f'Expected a list of items but got type "{type(values[key]).__name__}".']
+            return []
+
+        items = []
+        for index, item in enumerate(values[key]):
+            if isinstance(item, dict):
+                items.append((index, item))
+            else:
+                errors[f"{prefix}{key}.{index}.non_field_errors"] = ["Invalid data. Expected a dictionary."]
+
+        return items
+
+
+class BulkSpecificationLoad:
+    """
+    Load newline-delimited JSON trees from a trusted feed, in the layout ``export_data?format=ndjson`` produces.
+
+    Lines are validated in one streaming pass with ``TreeValidator``. On PostgreSQL, every ``chunk_size`` valid
+    trees are sent with ``COPY`` to temporary staging tables; once the feed is read, trees with a group name
+    already in use are dropped, and one ``INSERT ... SELECT`` per table resolves the foreign keys into the real
+    tables, in a single statement and transaction. Elsewhere each chunk is saved with ``SpecificationImporter``.
+    Invalid lines are reported with their line number and skipped, as ``import_stream`` does.
+    """
+
+    def __init__(self, chunk_size=5000, batch_size=None):
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.validator = TreeValidator()
+        self.lines = 0
+        self.imported = 0
+        self.errors = []
+
+    def run(self, lines):
+        chunks = (self.validate_chunk(chunk) for chunk in chunked(numbered_lines(lines), self.chunk_size))
+
+        if supports_copy():
+            with transaction.atomic():
+                self.create_staging_tables()
+                for chunk in chunks:
+                    self.stage_chunk(chunk)
+                self.reject_conflicting_groups()
+                self.imported = self.merge()
+                self.drop_staging_tables()
+        else:
+            for chunk in chunks:
+                self.save_chunk(chunk)
+        # Conflicting group names are found after the other errors of their chunk, or of the whole feed
+        self.errors.sort(key=lambda error: error["line"])
+
+        return self
+
+    def validate_chunk(self, chunk):
+        """Return the ``(line_number, data)`` of the valid lines of ``chunk``."""
+        valid = []
+        for number, line in chunk:
+            self.lines += 1
+            try:
+                tree = json.loads(line)
+            except ValueError as exc:
+                self.add_error(number, {"non_field_errors": [f"Invalid JSON: {exc}"]})
+                continue
+
+            data, errors = self.validator.validate(tree)
+            if errors:
+                self.add_error(number, errors)
+            else:
+                valid.append((number, data))
+
+        return valid
+
+    def save_chunk(self, chunk):
+        conflicts = group_name_conflicts([data for _, data in chunk])
+        for index, errors in conflicts.items():
+            self.add_error(chunk[index][0], {"groups": errors})
+
+        valid_data = [data for index, (_, data) in enumerate(chunk) if index not in conflicts]
+        if valid_data:
+            self.imported += len(SpecificationImporter(batch_size=self.batch_size).save(valid_data))
+
+    def create_staging_tables(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE specification_staging "
+                "(line integer PRIMARY KEY, id bigint, name text, code_number text, completed boolean, status text) "
+                "ON COMMIT DROP"
+            )
+            cursor.execute(
+                "CREATE TEMPORARY TABLE group_staging "
+                "(line integer, position integer, id bigint, name text, group_code text) ON COMMIT DROP"
+            )
+            cursor.execute(
+                "CREATE TEMPORARY TABLE component_staging "
+                "(line integer, group_position integer, name text, description text, part_code text) ON COMMIT DROP"
+            )
+
+    def drop_staging_tables(self):
+        # Also dropped on commit; dropped now so another load can run in the same transaction
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE specification_staging, group_staging, component_staging")
+
+    def stage_chunk(self, chunk):
+        specifications, groups, components = [], [], []
+        for line, data in chunk:
+            specifications.append((line, data["name"], data["code_number"], data["completed"], data["status"]))
+            components.extend(
+                (line, None, component_data["name"], component_data["description"], component_data["part_code"])
+                for component_data in data["components"]
+            )
+            for position, group_data in enumerate(data["groups"]):
+                groups.append((line, position, group_data["name"], group_data["group_code"]))
+                components.extend(
+                    (
+                        line,
+                        position,
+                        component_data["name"],
+                        component_data["description"],
+                        component_data["part_code"],
+                    )
+                    for component_data in group_data["components"]
+                )
+
+        copy_rows("specification_staging", ["line", "name", "code_number", "completed", "status"], specifications)
+        copy_rows("group_staging", ["line", "position", "name", "group_code"], groups)
+        copy_rows("component_staging", ["line", "group_position", "name", "description", "part_code"], components)
+
+    def reject_conflicting_groups(self):
+        """
+        Drop the trees using a group name of an existing group, of a group earlier in the feed, or twice.
+
+        Both checks are set-based (a semi-join and a window), so they stay linear however large the feed is.
+        """
+        with connection.cursor() as cursor:
+            for table in ["specification_staging", "group_staging", "component_staging"]:
+                # Temporary tables are never analyzed automatically
+                cursor.execute(f"ANALYZE {table}")
+
+            cursor.execute(
+                f"""
+                SELECT staged.line, staged.name, false
+                FROM group_staging staged
+                WHERE EXISTS (SELECT 1 FROM {connection.ops.quote_name(Group._meta.db_table)} existing
+                              WHERE existing.name = staged.name)
+                UNION
+                SELECT line, name, line = owner
+                FROM (SELECT line, name, count(*) AS uses, min(line) OVER (PARTITION BY name) AS owner
+                      FROM group_staging
+                      GROUP BY line, name) staged
+                WHERE line > owner OR uses > 1
+                ORDER BY 1, 2, 3
+                """
+            )
+            conflicts = {}
+            for line, name, repeated in cursor.fetchall():
+                errors = conflicts.setdefault(line, {})
+                # A name both taken and repeated is reported as taken
+                errors.setdefault(name, group_name_error(name, repeated))
+            if not conflicts:
+                return
+
+            for line, errors in conflicts.items():
+                self.add_error(line, {"groups": list(errors.values())})
+            for table in ["specification_staging", "group_staging", "component_staging"]:
+                cursor.execute(f"DELETE FROM {table} WHERE line = ANY(%s)", [list(conflicts)])
+
+    def merge(self):
+        """Insert the staged trees into the real tables and return the number of specifications."""
+        quote_name = connection.ops.quote_name
+        specification_table = quote_name(Specification._meta.db_table)
+        group_table = quote_name(Group._meta.db_table)
+        built_count_table = quote_name(BuiltSpecificationCount._meta.db_table)
+
+        with connection.cursor() as cursor:
+            # Ids are drawn up front so the groups and components can be joined to their parents by line
+            for table, model in [("specification_staging", Specification), ("group_staging", Group)]:
+                cursor.execute(
+                    f"UPDATE {table} SET id = nextval(pg_get_serial_sequence(%s, 'id'))", [model._meta.db_table]
+                )
+
+            cursor.execute(
+                f"""
+                WITH counts AS (
+                    SELECT line, count(*) AS components,
+                           count(*) FILTER (WHERE part_code IS NULL OR part_code = '') AS missing_parts
+                    FROM component_staging
+                    GROUP BY line
+                ), specifications AS (
+                    INSERT INTO {specification_table} (id, created, modified, status, status_changed, name,
+                                                       code_number, completed, component_count, missing_part_count)
+                    SELECT staged.id, now(), now(), staged.status, now(), staged.name, staged.code_number,
+                           staged.completed, coalesce(counts.components, 0), coalesce(counts.missing_parts, 0)
+                    FROM specification_staging staged
+                    LEFT JOIN counts USING (line)
+                ), groups AS (
+                    INSERT INTO {group_table} (id, created, modified, name, group_code, specification_id)
+                    SELECT staged.id, now(), now(), staged.name, staged.group_code, specification.id
+                    FROM group_staging staged
+                    JOIN specification_staging specification USING (line)
+                ), built_counts AS (
+                    INSERT INTO {built_count_table} (code_number, built_count)
+                    SELECT code_number, count(*) FROM specification_staging WHERE status = %s GROUP BY code_number
+                    ON CONFLICT (code_number)
+                    DO UPDATE SET built_count = {built_count_table}.built_count + EXCLUDED.built_count
+                )
+                INSERT INTO {quote_name(Component._meta.db_table)} (created, modified, name, description, part_code,
+                                                                   specification_id, group_id)
+                SELECT now(), now(), staged.name, staged.description, staged.part_code, specification.id, grp.id
+                FROM component_staging staged
+                JOIN specification_staging specification USING (line)
+                LEFT JOIN group_staging grp ON grp.line = staged.line AND grp.position = staged.group_position
+                """,
+                [Specification.STATUS.Built],
+            )
+            cursor.execute("SELECT count(*) FROM specification_staging")
+            loaded = cursor.fetchone()[0]
+
+        # The specifications are new, so only the version of the whole collection is stale
+        specification_versions.bump_collection()
+
+        return loaded
+
+    def add_error(self, line_number, errors):
+        self.errors.append({"line": line_number, "errors": errors})
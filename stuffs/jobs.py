@@ -0,0 +1,135 @@
+import logging
+from datetime import timedelta
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .importers import ChunkedSpecificationImport, chunked, numbered_lines
+from .models import ImportJob, ImportJobChunk
+from .serializers import SpecificationImportExportSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_import_job(lines, chunk_size):
+    """Queue NDJSON lines as an import job, spooled ``chunk_size`` lines per row so memory only holds one chunk."""
+    with transaction.atomic():
+        job = ImportJob.objects.create(chunk_size=chunk_size)
+        for number, chunk in enumerate(chunked(lines, chunk_size)):
+            chunk = [(line.decode() if isinstance(line, bytes) else line).rstrip("\r\n") for line in chunk]
+            ImportJobChunk.objects.create(job=job, number=number, lines="\n".join(chunk))
+            job.total_lines += sum(1 for _ in numbered_lines(chunk))
+        job.save(update_fields=["total_lines"])
+
+    return job
+
+
+def spooled_lines(job):
+    """Yield the lines of ``job``, reading one spooled chunk at a time."""
+    for pk in list(job.chunks.values_list("pk", flat=True)):
+        yield from ImportJobChunk.objects.values_list("lines", flat=True).get(pk=pk).split("\n")
+
+
+def claim_import_job(worker, stale_after=timedelta(minutes=10)):
+    """
+    Claim the oldest queued job for ``worker``, or ``None`` when there is nothing to do.
+
+    Rows locked by another worker are skipped, so several workers can drain the queue at once.
+    Running jobs whose progress has not moved for ``stale_after`` are claimed again and resumed.
+    """
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ImportJob.STATUS.Queued)
+                | Q(status=ImportJob.STATUS.Running, modified__lt=timezone.now() - stale_after)
+            )
+            .order_by("created")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = ImportJob.STATUS.Running
+        job.worker = worker
+        job.save(update_fields=["status", "worker"])
+
+    return job
+
+
+def owns_import_job(job):
+    """
+    Lock the row of ``job`` and tell whether this run still owns it.
+
+    A job stalled past ``stale_after`` may be claimed again while its first worker is still alive: the run
+    whose worker or progress no longer matches the row has lost it and must stop.
+    """
+    current = ImportJob.objects.select_for_update().only("worker", "processed_lines").get(pk=job.pk)
+
+    return (current.worker, current.processed_lines) == (job.worker, job.processed_lines)
+
+
+def run_import_job(job):
+    """Import the spooled lines of the job chunk by chunk, recording the progress in the same transaction as each."""
+    run = ChunkedSpecificationImport(SpecificationImportExportSerializer, chunk_size=job.chunk_size)
+    run.lines, run.imported, run.errors, run.error_count = (
+        job.processed_lines,
+        job.imported_count,
+        list(job.errors),
+        job.error_count,
+    )
+
+    remaining_lines = islice(numbered_lines(spooled_lines(job)), job.processed_lines, None)
+    try:
+        for chunk in chunked(remaining_lines, job.chunk_size):
+            with transaction.atomic():
+                if not owns_import_job(job):
+                    logger.warning("Import job %s was claimed by another worker, stopping", job.pk)
+                    return job
+                run.import_chunk(chunk)
+
+                progress = {
+                    "processed_lines": run.lines,
+                    "imported_count": run.imported,
+                    "error_count": run.error_count,
+                }
+                # The kept errors are capped, so they are only written while the cap isn't reached
+                if len(run.errors) > len(job.errors):
+                    progress["errors"] = list(run.errors)
+                ImportJob.objects.filter(pk=job.pk).update(**progress, modified=timezone.now())
+            # Only once committed, for owns_import_job() to compare with the row
+            for field, value in progress.items():
+                setattr(job, field, value)
+    except Exception as exc:
+        logger.exception("Import job %s failed", job.pk)
+        fail_import_job(job, str(exc))
+        return job
+
+    with transaction.atomic():
+        if owns_import_job(job):
+            job.status = ImportJob.STATUS.Completed
+            job.save(update_fields=["status"])
+
+    return job
+
+
+def fail_import_job(job, message):
+    """
+    Mark ``job`` as failed with ``message`` added to its errors, unless another worker has claimed it.
+
+    If the error can't be recorded, e.g. because the database failed, the job is still marked as failed.
+    """
+    job.status = ImportJob.STATUS.Failed
+    job.errors = [*job.errors, {"line": None, "errors": {"non_field_errors": [message]}}]
+    job.error_count += 1
+    try:
+        with transaction.atomic():
+            if owns_import_job(job):
+                job.save(update_fields=["status", "errors", "error_count"])
+    except DatabaseError:
+        logger.exception("Could not record the failure of import job %s", job.pk)
+        ImportJob.objects.filter(pk=job.pk, worker=job.worker, processed_lines=job.processed_lines).update(
+            status=ImportJob.STATUS.Failed, modified=timezone.now()
+        )
@@ -1,11 +1,134 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 
 
 class SpecificationReportManager(models.Manager):
+    def compute(self, *names):
+        """Map each of the reports ``names`` of ``stuffs.reports`` to its rows, computed together and memoized."""
+        from .reports import report_engine
+
+        return report_engine.compute(names)
+
     def built_count(self):
+        """Built specifications per ``code_number``, read from the ``BuiltSpecificationCount`` summary."""
+        from .models import BuiltSpecificationCount
+
+        return (
+            BuiltSpecificationCount.objects.filter(built_count__gt=0)
+            .values("code_number", "built_count")
+            .order_by("-built_count", "code_number")
+        )
+
+    def scan_built_count(self):
+        """Count the built specifications per ``code_number`` from the specifications themselves."""
         return (
             self.filter(status="Built")
             .values("code_number")
             .annotate(built_count=models.Count("code_number"))
             .order_by("-built_count")
         )
+
+
+class SearchableManager(models.Manager):
+    """Leave the ``search_vector`` column out of the queries; only the database reads and writes it."""
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
+
+class SpecificationManager(models.Manager):
+    def add_to_counters(self, component_counts, missing_part_counts):
+        """
+        Add changes to ``component_count`` and ``missing_part_count`` with a single ``UPDATE``.
+
+        Both arguments map a specification id to a count change; the increments use ``F()`` so concurrent
+        writers don't lose updates.
+        """
+        pks = {pk for pk, delta in [*component_counts.items(), *missing_part_counts.items()] if delta}
+        if not pks:
+            return
+
+        def increments(counts):
+            return models.Case(
+                *[models.When(pk=pk, then=models.Value(delta)) for pk, delta in counts.items() if delta],
+                default=models.Value(0),
+            )
+
+        self.filter(pk__in=pks).update(
+            component_count=models.F("component_count") + increments(component_counts),
+            missing_part_count=models.F("missing_part_count") + increments(missing_part_counts),
+        )
+
+    def actual_counters(self):
+        """Expressions counting the components and the missing parts of each specification."""
+        from .models import Component
+
+        components = Component.objects.filter(specification=models.OuterRef("pk")).order_by().values("specification")
+
+        def count(queryset):
+            return Coalesce(models.Subquery(queryset.annotate(count=models.Count("pk")).values("count")), 0)
+
+        return {
+            "component_count": count(components),
+            "missing_part_count": count(components.filter(Component.MISSING_PART)),
+        }
+
+    def drifted_counters(self):
+        """Specifications whose counters don't match their components, annotated with the actual counts."""
+        actual = {f"actual_{field}": expression for field, expression in self.actual_counters().items()}
+
+        return self.annotate(**actual).exclude(
+            component_count=models.F("actual_component_count"),
+            missing_part_count=models.F("actual_missing_part_count"),
+        )
+
+    def repair_counters(self):
+        """
+        Recompute the counters of the drifted specifications and return how many were repaired.
+
+        Their cached trees are invalidated too, so run it in a transaction to drop them again on commit.
+        """
+        from .cache import specification_versions
+
+        pks = list(self.drifted_counters().values_list("pk", flat=True))
+        repaired = self.filter(pk__in=pks).update(**self.actual_counters())
+        specification_versions.bump(pks)
+
+        return repaired
+
+
+class BuiltSpecificationCountManager(models.Manager):
+    def add(self, deltas):
+        """
+        Add ``deltas`` (a mapping of ``code_number`` to a count change) with a single ``UPDATE``.
+
+        Missing rows are created first; the increments use ``F()`` so concurrent writers don't lose updates, and
+        the rows are written in ``code_number`` order so concurrent transactions lock them in the same order.
+        """
+        deltas = {code_number: delta for code_number, delta in sorted(deltas.items()) if delta}
+        if not deltas:
+            return
+
+        self.bulk_create([self.model(code_number=code_number) for code_number in deltas], ignore_conflicts=True)
+        self.filter(code_number__in=deltas).update(
+            built_count=models.F("built_count")
+            + models.Case(
+                *[
+                    models.When(code_number=code_number, then=models.Value(delta))
+                    for code_number, delta in deltas.items()
+                ],
+                default=models.Value(0),
+            )
+        )
+
+    def rebuild(self):
+        """Recompute every row from the specifications and return the counts."""
+        from .models import Specification
+
+        counts = {row["code_number"]: row["built_count"] for row in Specification.reports.scan_built_count()}
+        self.all().delete()
+        self.bulk_create(
+            [self.model(code_number=code_number, built_count=count) for code_number, count in counts.items()]
+        )
+
+        return counts
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.2 on 2026-10-18 12:06
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stuffs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "created",
+                    model_utils.fields.AutoCreatedField(
+                        default=django.utils.timezone.now, editable=False, verbose_name="created"
+                    ),
+                ),
+                (
+                    "modified",
+                    model_utils.fields.AutoLastModifiedField(
+                        default=django.utils.timezone.now, editable=False, verbose_name="modified"
+                    ),
+                ),
+                (
+                    "status_changed",
+                    model_utils.fields.MonitorField(
+                        default=django.utils.timezone.now, monitor="status", verbose_name="status changed"
+                    ),
+                ),
+                ("payload", models.TextField(help_text="Newline-delimited JSON, one specification tree per line.")),
+                ("chunk_size", models.PositiveIntegerField()),
+                ("total_lines", models.PositiveIntegerField(default=0)),
+                ("processed_lines", models.PositiveIntegerField(default=0)),
+                ("imported_count", models.PositiveIntegerField(default=0)),
+                ("errors", models.JSONField(blank=True, default=list)),
+                ("worker", models.CharField(blank=True, max_length=200)),
+                (
+                    "status",
+                    model_utils.fields.StatusField(
+                        choices=[
+                            ("Queued", "Queued"),
+                            ("Running", "Running"),
+                            ("Completed", "Completed"),
+                            ("Failed", "Failed"),
+                        ],
+                        default="Queued",
+                        max_length=100,
+                        no_check_for_status=True,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-created",),
+                "indexes": [models.Index(fields=["status", "created"], name="stuffs_impo_status_a13af0_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.2 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+def populate_built_counts(apps, schema_editor):
+    Specification = apps.get_model("stuffs", "Specification")
+    BuiltSpecificationCount = apps.get_model("stuffs", "BuiltSpecificationCount")
+
+    counts = (
+        Specification.objects.filter(status="Built")
+        .values("code_number")
+        .annotate(built_count=models.Count("code_number"))
+        .order_by()
+    )
+    BuiltSpecificationCount.objects.bulk_create(
+        BuiltSpecificationCount(code_number=row["code_number"], built_count=row["built_count"]) for row in counts
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stuffs", "0002_import_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BuiltSpecificationCount",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("code_number", models.CharField(max_length=50, unique=True)),
+                ("built_count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_built_counts, migrations.RunPython.noop),
+    ]
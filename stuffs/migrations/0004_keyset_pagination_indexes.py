@@ -0,0 +1,24 @@
+# Generated by Django 4.2.2 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stuffs", "0003_built_specification_count"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="component",
+            index=models.Index(fields=["specification", "-created", "-id"], name="stuffs_comp_specifi_374c49_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="group",
+            index=models.Index(fields=["specification", "-created", "-id"], name="stuffs_grou_specifi_e103f2_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="specification",
+            index=models.Index(fields=["-created", "-id"], name="stuffs_spec_created_6387fb_idx"),
+        ),
+    ]
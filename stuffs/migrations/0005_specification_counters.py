@@ -0,0 +1,39 @@
+# Generated by Django 4.2.2 on 2026-10-18 12:20
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Specification = apps.get_model("stuffs", "Specification")
+    Component = apps.get_model("stuffs", "Component")
+
+    components = Component.objects.filter(specification=models.OuterRef("pk")).order_by().values("specification")
+    missing_parts = components.filter(models.Q(part_code=None) | models.Q(part_code=""))
+
+    def count(queryset):
+        return Coalesce(models.Subquery(queryset.annotate(count=models.Count("pk")).values("count")), 0)
+
+    Specification.objects.update(component_count=count(components), missing_part_count=count(missing_parts))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stuffs", "0004_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="specification",
+            name="component_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="specification",
+            name="missing_part_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Number of components without a part code."
+            ),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.2 on 2026-10-18 12:23
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Weighted columns of each search vector, and the code column searched by prefix
+SEARCH_DOCUMENTS = {
+    "stuffs_component": {"weights": {"A": ["name", "part_code"], "B": ["description"]}, "code": "part_code"},
+    "stuffs_group": {"weights": {"A": ["name", "group_code"]}, "code": "group_code"},
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    # SQLite has no text search types; the search falls back to LIKE there
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table, document in SEARCH_DOCUMENTS.items():
+        vector = " || ".join(
+            f"setweight(to_tsvector('simple', coalesce(NEW.{column}, '')), '{weight}')"
+            for weight, columns in document["weights"].items()
+            for column in columns
+        )
+        columns = ", ".join(column for columns in document["weights"].values() for column in columns)
+        schema_editor.execute(
+            f"""
+            CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+        schema_editor.execute(
+            f"""
+            CREATE TRIGGER {table}_search_vector_update
+            BEFORE INSERT OR UPDATE OF {columns}, search_vector ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+            """
+        )
+        schema_editor.execute(f"UPDATE {table} SET search_vector = NULL")
+        schema_editor.execute(f"CREATE INDEX {table}_search_vector ON {table} USING gin (search_vector)")
+        schema_editor.execute(
+            f"CREATE INDEX {table}_code_prefix ON {table} (UPPER({document['code']}::text) text_pattern_ops)"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for table in SEARCH_DOCUMENTS:
+        for index in ["search_vector", "code_prefix"]:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{index}")
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}")
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stuffs", "0005_specification_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="component",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, help_text="Maintained by a database trigger.", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="group",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, help_text="Maintained by a database trigger.", null=True
+            ),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def spool_payloads(apps, schema_editor):
+    ImportJob = apps.get_model("stuffs", "ImportJob")
+    ImportJobChunk = apps.get_model("stuffs", "ImportJobChunk")
+    for job in ImportJob.objects.exclude(payload="").iterator():
+        ImportJobChunk.objects.create(job=job, number=0, lines=job.payload)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stuffs", "0006_search_vectors"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportJobChunk",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("number", models.PositiveIntegerField()),
+                ("lines", models.TextField(help_text="Newline-delimited JSON, one specification tree per line.")),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="chunks", to="stuffs.importjob"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("number",),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="importjobchunk",
+            constraint=models.UniqueConstraint(fields=("job", "number"), name="unique_import_job_chunk_number"),
+        ),
+        migrations.RunPython(spool_payloads, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="importjob",
+            name="payload",
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.2 on 2026-10-18 13:26
+
+from django.db import migrations, models
+
+
+def count_errors(apps, schema_editor):
+    ImportJob = apps.get_model("stuffs", "ImportJob")
+    for job in ImportJob.objects.exclude(errors=[]).iterator():
+        job.error_count = len(job.errors)
+        job.save(update_fields=["error_count"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("stuffs", "0007_import_job_chunks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="error_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="importjob",
+            name="errors",
+            field=models.JSONField(blank=True, default=list, help_text="The first line errors, see error_count."),
+        ),
+        migrations.RunPython(count_errors, migrations.RunPython.noop),
+    ]
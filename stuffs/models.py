@@ -1,10 +1,17 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.urls import reverse
 from model_utils import Choices
 from model_utils.fields import StatusField
 from model_utils.models import StatusModel, TimeStampedModel
+from model_utils.tracker import FieldTracker
 
-from .managers import SpecificationReportManager
+from .managers import (
+    BuiltSpecificationCountManager,
+    SearchableManager,
+    SpecificationManager,
+    SpecificationReportManager,
+)
 
 
 class Specification(TimeStampedModel, StatusModel):
@@ -14,12 +21,21 @@ class Specification(TimeStampedModel, StatusModel):
     code_number = models.CharField(max_length=50)
     completed = models.BooleanField(default=False)
     status = StatusField(choices=STATUS)
+    component_count = models.PositiveIntegerField(default=0, editable=False)
+    missing_part_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Number of components without a part code."
+    )
 
-    objects = models.Manager()
+    COUNTER_FIELDS = ("component_count", "missing_part_count")
+
+    objects = SpecificationManager()
     reports = SpecificationReportManager()
 
+    tracker = FieldTracker(fields=["status", "code_number"])
+
     class Meta:
         ordering = ("-created",)
+        indexes = [models.Index(fields=["-created", "-id"])]
 
     def __str__(self):
         return self.name
@@ -27,14 +43,50 @@ class Specification(TimeStampedModel, StatusModel):
     def get_absolute_url(self):
         return reverse("Specification-detail", kwargs={"pk": self.pk})
 
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        """
+        Save the instance; saving a loaded instance updates every field except the counters.
+
+        The counters are only changed with ``F()`` expressions, so an instance loaded before a component write must
+        not overwrite them. New instances, copies (``pk = None``) and ``force_insert`` are inserted with all fields.
+        As with ``update_fields``, a loaded instance whose row was deleted meanwhile raises ``DatabaseError``
+        instead of being inserted again; pass ``force_insert=True`` to re-create it.
+        """
+        if update_fields is None and not force_insert and not self._state.adding and self.pk is not None:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+
+        super().save(force_insert=force_insert, force_update=force_update, using=using, update_fields=update_fields)
+
+
+class BuiltSpecificationCount(models.Model):
+    """Number of specifications in the "Built" status per ``code_number``, kept up to date on every write."""
+
+    code_number = models.CharField(max_length=50, unique=True)
+    built_count = models.PositiveIntegerField(default=0)
+
+    objects = BuiltSpecificationCountManager()
+
+    def __str__(self):
+        return f"{self.code_number}: {self.built_count}"
+
 
 class Group(TimeStampedModel):
     name = models.CharField(max_length=50)
     group_code = models.CharField(max_length=50)
     specification = models.ForeignKey(Specification, related_name="groups", on_delete=models.CASCADE)
+    search_vector = SearchVectorField(null=True, editable=False, help_text="Maintained by a database trigger.")
+
+    objects = SearchableManager()
+
+    tracker = FieldTracker(fields=["specification_id"])
 
     class Meta:
         ordering = ("-created",)
+        indexes = [models.Index(fields=["specification", "-created", "-id"])]
 
     def __str__(self):
         return self.name
@@ -44,17 +96,69 @@ class Group(TimeStampedModel):
 
 
 class Component(TimeStampedModel):
+    MISSING_PART = models.Q(part_code=None) | models.Q(part_code="")
+
     name = models.CharField(max_length=200)
     description = models.TextField()
     part_code = models.CharField(max_length=200, null=True, blank=True)
     specification = models.ForeignKey(Specification, related_name="components", on_delete=models.CASCADE)
     group = models.ForeignKey(Group, related_name="components", on_delete=models.CASCADE, null=True)
+    search_vector = SearchVectorField(null=True, editable=False, help_text="Maintained by a database trigger.")
+
+    objects = SearchableManager()
+
+    tracker = FieldTracker(fields=["specification_id", "part_code"])
 
     class Meta:
         ordering = ("-created",)
+        indexes = [models.Index(fields=["specification", "-created", "-id"])]
 
     def __str__(self):
         return self.name
 
     def get_absolute_url(self):
         return reverse("Component-detail", kwargs={"pk": self.pk})
+
+    @property
+    def missing_part(self):
+        return not self.part_code
+
+
+class ImportJob(TimeStampedModel, StatusModel):
+    STATUS = Choices("Queued", "Running", "Completed", "Failed")
+
+    chunk_size = models.PositiveIntegerField()
+    total_lines = models.PositiveIntegerField(default=0)
+    processed_lines = models.PositiveIntegerField(default=0)
+    imported_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="The first line errors, see error_count.")
+    error_count = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=200, blank=True)
+    status = StatusField(choices=STATUS)
+
+    objects = models.Manager()
+
+    class Meta:
+        ordering = ("-created",)
+        indexes = [models.Index(fields=["status", "created"])]
+
+    def __str__(self):
+        return f"Import job {self.pk} ({self.status})"
+
+    def get_absolute_url(self):
+        return reverse("importjob-detail", kwargs={"pk": self.pk})
+
+
+class ImportJobChunk(models.Model):
+    """``chunk_size`` lines of the payload of an import job, spooled one row at a time to keep memory flat."""
+
+    job = models.ForeignKey(ImportJob, related_name="chunks", on_delete=models.CASCADE)
+    number = models.PositiveIntegerField()
+    lines = models.TextField(help_text="Newline-delimited JSON, one specification tree per line.")
+
+    class Meta:
+        ordering = ("number",)
+        constraints = [models.UniqueConstraint(fields=["job", "number"], name="unique_import_job_chunk_number")]
+
+    def __str__(self):
+        return f"Chunk {self.number} of import job {self.job_id}"
@@ -0,0 +1,51 @@
+from django.db import models
+from django.db.models.functions import TruncMonth
+
+from core.reports import Report, ReportEngine
+
+from .cache import specification_versions
+from .models import Component, Specification
+
+report_engine = ReportEngine(
+    [
+        Report(
+            "status_distribution",
+            Specification,
+            dimensions={"code_number": models.F("code_number"), "status": models.F("status")},
+            measures={"specifications": models.Count("pk")},
+            labels={"code_number": "Specification Code", "status": "Status", "specifications": "Specifications"},
+            ordering=("code_number", "status"),
+        ),
+        Report(
+            "specifications_per_month",
+            Specification,
+            dimensions={"month": TruncMonth("created", output_field=models.DateField())},
+            measures={
+                "specifications": models.Count("pk"),
+                "built": models.Count("pk", filter=models.Q(status=Specification.STATUS.Built)),
+            },
+            labels={"month": "Month", "specifications": "Specifications", "built": "Built Specifications"},
+            ordering=("month",),
+        ),
+        Report(
+            "parts_coverage",
+            Component,
+            dimensions={"specification": models.F("specification_id"), "group": models.F("group__name")},
+            measures={
+                "components": models.Count("pk"),
+                "with_part": models.Count("pk", filter=~Component.MISSING_PART),
+            },
+            columns={"coverage": lambda row: round(100 * row["with_part"] / row["components"], 1)},
+            labels={
+                "specification": "Specification",
+                "group": "Group",
+                "components": "Components",
+                "with_part": "Components With a Part",
+                "coverage": "Coverage (%)",
+            },
+            ordering=("specification", "group"),
+        ),
+    ],
+    # Every write to a specification, a group or a component drops its collection version
+    versions=specification_versions,
+)
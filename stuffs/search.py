@@ -0,0 +1,45 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+
+
+def prefix_query(text):
+    """A text search query matching every word of ``text`` as a prefix, e.g. ``oak do`` -> ``oak:* & do:*``."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config="simple")
+
+
+def search(queryset, text, code_field, text_fields):
+    """
+    Filter ``queryset`` on ``text`` and annotate each row with a ``rank``, higher is better.
+
+    On PostgreSQL a row matches when every word of ``text`` starts a word of its ``search_vector`` or when its
+    code starts with ``text``; both are served by an index, so the query never scans the table, and a ``text``
+    without words matches nothing. Elsewhere the ``text_fields`` are searched with ``LIKE``. Rows whose code
+    starts with ``text`` rank first.
+    """
+    code_match = Q(**{f"{code_field}__istartswith": text})
+    postgresql = connections[queryset.db].vendor == "postgresql"
+    query = prefix_query(text) if postgresql else None
+
+    if postgresql and query is None:
+        # No word for the index to match, and falling back to LIKE would scan the table
+        return queryset.none().annotate(rank=Value(0.0))
+    if query is not None:
+        matches = Q(search_vector=query) | code_match
+        text_rank = SearchRank(F("search_vector"), query)
+    else:
+        matches = code_match
+        for field in text_fields:
+            matches |= Q(**{f"{field}__icontains": text})
+        text_rank = Value(0.0)
+
+    rank = Cast(text_rank + Case(When(code_match, then=Value(1.0)), default=Value(0.0)), FloatField())
+
+    return queryset.filter(matches).annotate(rank=rank)
@@ -0,0 +1,267 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from random import Random
+
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from core.db import copy_rows, reserve_ids, supports_copy
+
+from .cache import specification_versions
+from .importers import SpecificationImporter
+from .models import BuiltSpecificationCount, Component, Group, Specification
+
+# Number of components of each named dataset size
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+MATERIALS = ["Oak", "Pine", "Steel", "Brass", "Granite", "Glass", "Copper", "Maple"]
+ITEMS = ["door", "hinge", "cabinet", "sink", "handle", "shelf", "panel", "frame"]
+
+
+class DatasetGenerator:
+    """
+    Generate the same specification trees for the same ``seed``, ``components`` and shape.
+
+    Every specification has ``components_per_specification`` components (the last one may have fewer), of which
+    ``ungrouped_components`` (one in ten by default) have no group and the rest are spread over
+    ``groups_per_specification`` groups. ``statuses`` maps each status to its weight (all of them equally by
+    default) and is followed exactly, cycling over the specifications; a component is missing its part code with
+    the probability ``missing_part_ratio``. Each tree is generated from its own index, so any range of them can
+    be generated on its own.
+    """
+
+    def __init__(
+        self,
+        components,
+        seed=0,
+        components_per_specification=100,
+        groups_per_specification=5,
+        ungrouped_components=None,
+        statuses=None,
+        missing_part_ratio=0.2,
+    ):
+        self.components = components
+        self.seed = seed
+        self.components_per_specification = components_per_specification
+        self.groups_per_specification = groups_per_specification
+        self.ungrouped_components = (
+            components_per_specification // 10 if ungrouped_components is None else ungrouped_components
+        )
+        self.statuses = statuses or {status: 1 for status, _ in Specification.STATUS}
+        self.missing_part_ratio = missing_part_ratio
+
+    @classmethod
+    def of_specifications(
+        cls,
+        specification_count,
+        groups_per_specification=5,
+        components_per_group=18,
+        ungrouped_components=10,
+        **kwargs,
+    ):
+        """A generator of ``specification_count`` specifications with exactly the given number of components."""
+        components_per_specification = groups_per_specification * components_per_group + ungrouped_components
+
+        return cls(
+            specification_count * components_per_specification,
+            components_per_specification=components_per_specification,
+            groups_per_specification=groups_per_specification,
+            ungrouped_components=ungrouped_components,
+            **kwargs,
+        )
+
+    @property
+    def specification_count(self):
+        return -(-self.components // self.components_per_specification)
+
+    def specifications(self, start=0, stop=None):
+        """Yield the import payload of the trees ``start`` to ``stop``, see ``SpecificationImporter.build()``."""
+        statuses = [status for status, weight in self.statuses.items() for _ in range(weight)]
+        stop = self.specification_count if stop is None else min(stop, self.specification_count)
+        per_specification = self.components_per_specification
+
+        for index in range(start, stop):
+            random = Random(f"{self.seed}:{index}")
+            groups = [
+                {"name": f"Group {index}-{number}", "group_code": f"G-{index}-{number}", "components": []}
+                for number in range(self.groups_per_specification)
+            ]
+            ungrouped = []
+            for number in range(min(per_specification, self.components - index * per_specification)):
+                component = {
+                    "name": f"Component {index}-{number}",
+                    "description": f"{random.choice(MATERIALS)} {random.choice(ITEMS)} {number}",
+                    "part_code": (
+                        None if random.random() < self.missing_part_ratio else f"P-{random.randrange(10**8):08d}"
+                    ),
+                }
+                # The ungrouped components are spread evenly, so a shorter last tree keeps the same proportion
+                if (number + 1) * self.ungrouped_components // per_specification > (
+                    number * self.ungrouped_components // per_specification
+                ) or not groups:
+                    ungrouped.append(component)
+                else:
+                    grouped = number - len(ungrouped)
+                    groups[grouped % len(groups)]["components"].append(component)
+
+            yield {
+                "name": f"Specification {index}",
+                "code_number": f"SPEC-{index % 500:03d}",
+                "status": statuses[index % len(statuses)],
+                "groups": groups,
+                "components": ungrouped,
+            }
+
+
+def component_count(tree):
+    return len(tree["components"]) + sum(len(group_data["components"]) for group_data in tree["groups"])
+
+
+def copy_trees(trees):
+    """Create the trees with one ``COPY`` per table, their ids reserved up front; return the specification ids."""
+    now = timezone.now()
+    specification_ids = reserve_ids(Specification, len(trees))
+    group_ids = iter(reserve_ids(Group, sum(len(tree["groups"]) for tree in trees)))
+    component_ids = iter(reserve_ids(Component, sum(map(component_count, trees))))
+
+    specifications, groups, components = [], [], []
+    for specification_id, tree in zip(specification_ids, trees):
+        tree_components = [(None, component_data) for component_data in tree["components"]]
+        for group_data in tree["groups"]:
+            group_id = next(group_ids)
+            groups.append((group_id, now, now, group_data["name"], group_data["group_code"], specification_id))
+            tree_components.extend((group_id, component_data) for component_data in group_data["components"])
+
+        for group_id, component_data in tree_components:
+            components.append(
+                (
+                    next(component_ids),
+                    now,
+                    now,
+                    component_data["name"],
+                    component_data["description"],
+                    component_data["part_code"],
+                    specification_id,
+                    group_id,
+                )
+            )
+        missing_parts = sum(not component_data["part_code"] for _, component_data in tree_components)
+        specifications.append(
+            (
+                specification_id,
+                now,
+                now,
+                tree["status"],
+                now,
+                tree["name"],
+                tree["code_number"],
+                tree.get("completed", False),
+                len(tree_components),
+                missing_parts,
+            )
+        )
+
+    copy_rows(
+        Specification._meta.db_table,
+        [
+            "id",
+            "created",
+            "modified",
+            "status",
+            "status_changed",
+            "name",
+            "code_number",
+            "completed",
+            "component_count",
+            "missing_part_count",
+        ],
+        specifications,
+    )
+    copy_rows(Group._meta.db_table, ["id", "created", "modified", "name", "group_code", "specification_id"], groups)
+    copy_rows(
+        Component._meta.db_table,
+        ["id", "created", "modified", "name", "description", "part_code", "specification_id", "group_id"],
+        components,
+    )
+
+    return specification_ids
+
+
+def seeded_before(generator):
+    """Whether the database already holds group names of ``generator``, which every run names the same way."""
+    names = [group_data["name"] for tree in generator.specifications(0, 1) for group_data in tree["groups"]]
+
+    return Group.objects.filter(name__in=names).exists()
+
+
+def delete_dataset():
+    """
+    Delete every specification, group, component and built count, with one ``DELETE`` per table.
+
+    No model code runs, so it takes the same few statements at any size; the cached trees of the deleted
+    specifications are invalidated. Return the number of specifications deleted.
+    """
+    quote_name = connection.ops.quote_name
+    with transaction.atomic():
+        pks = list(Specification.objects.values_list("pk", flat=True))
+        with connection.cursor() as cursor:
+            for model in [Component, Group, Specification, BuiltSpecificationCount]:
+                cursor.execute(f"DELETE FROM {quote_name(model._meta.db_table)}")
+        specification_versions.bump(pks)
+
+    return len(pks)
+
+
+def seed_chunk(generator, start, stop, batch_size=None):
+    """
+    Create the trees ``start`` to ``stop`` of ``generator`` in one transaction, with ``COPY`` on PostgreSQL.
+
+    Return the number of rows per model.
+    """
+    trees = list(generator.specifications(start, stop))
+
+    with transaction.atomic():
+        if supports_copy():
+            specification_ids = copy_trees(trees)
+        else:
+            specifications, groups, components = SpecificationImporter().build(trees)
+            Specification.objects.bulk_create(specifications, batch_size=batch_size)
+            Group.objects.bulk_create(groups, batch_size=batch_size)
+            Component.objects.bulk_create(components, batch_size=batch_size)
+            specification_ids = [spec.pk for spec in specifications]
+        # With the rows, so an interrupted run leaves the summary consistent with what it committed
+        BuiltSpecificationCount.objects.add(
+            Counter(tree["code_number"] for tree in trees if tree["status"] == Specification.STATUS.Built)
+        )
+        specification_versions.bump(specification_ids)
+
+    return Counter(
+        specifications=len(trees),
+        groups=sum(len(tree["groups"]) for tree in trees),
+        components=sum(map(component_count, trees)),
+    )
+
+
+def seed_dataset(generator, workers=1, chunk_size=100, batch_size=5000):
+    """
+    Create the trees of ``generator``, ``chunk_size`` specifications per transaction, and return the rows per model.
+
+    With several ``workers``, the chunks are spread over that many processes, each with its own connection.
+    SQLite allows a single writer, so it always uses one.
+    """
+    count = generator.specification_count
+    starts = range(0, count, chunk_size)
+    stops = [min(start + chunk_size, count) for start in starts]
+
+    if workers > 1 and connection.vendor != "sqlite":
+        # The forked workers must not share the parent's connections
+        connections.close_all()
+        with ProcessPoolExecutor(workers, mp_context=get_context("fork")) as executor:
+            results = list(
+                executor.map(seed_chunk, [generator] * len(starts), starts, stops, [batch_size] * len(starts))
+            )
+    else:
+        results = [seed_chunk(generator, start, stop, batch_size) for start, stop in zip(starts, stops)]
+
+    return sum(results, Counter())
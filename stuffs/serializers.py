@@ -1,12 +1,21 @@
-from copy import deepcopy
+import re
+from collections import Counter
 
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Component, Group, Specification
+from core.serializers import CachedHyperlinkedModelSerializer, SparseFieldsetSerializerMixin
 
+from .cache import specification_versions
+from .cloners import SpecificationCloner
+from .importers import SpecificationImporter, group_name_conflicts
+from .models import Component, Group, ImportJob, Specification
+from .reports import report_engine
 
-class SpecificationSerializer(serializers.HyperlinkedModelSerializer):
+
+class SpecificationSerializer(SparseFieldsetSerializerMixin, CachedHyperlinkedModelSerializer):
     groups = serializers.StringRelatedField(many=True, read_only=True)
     components = serializers.StringRelatedField(many=True, read_only=True)
 
@@ -15,7 +24,7 @@ class SpecificationSerializer(serializers.HyperlinkedModelSerializer):
         fields = "__all__"
 
     def validate_completed(self, value):
-        if value and self.instance.components.filter(Q(part_code=None) | Q(part_code="")).exists():
+        if value and self.instance and self.instance.missing_part_count:
             raise serializers.ValidationError("Cannot complete a specification if any component is missing a part.")
 
         return value
@@ -27,7 +36,7 @@ class SpecificationSerializer(serializers.HyperlinkedModelSerializer):
         return data
 
 
-class GroupSerializer(serializers.HyperlinkedModelSerializer):
+class GroupSerializer(SparseFieldsetSerializerMixin, CachedHyperlinkedModelSerializer):
     components = serializers.StringRelatedField(many=True, read_only=True)
 
     def __init__(self, *args, **kwargs):
@@ -36,7 +45,7 @@ class GroupSerializer(serializers.HyperlinkedModelSerializer):
 
     class Meta:
         model = Group
-        fields = "__all__"
+        exclude = ("search_vector",)
         read_only_fields = ("specification",)
 
     def validate_name(self, value):
@@ -51,10 +60,12 @@ class GroupSerializer(serializers.HyperlinkedModelSerializer):
         return data
 
 
-class BaseComponentSerializer(serializers.HyperlinkedModelSerializer):
+class BaseComponentSerializer(SparseFieldsetSerializerMixin, CachedHyperlinkedModelSerializer):
+    COMPLETED_SPECIFICATION_MESSAGE = "Cannot create/update a component of a completed specification."
+
     class Meta:
         model = Component
-        fields = "__all__"
+        exclude = ("search_vector",)
 
     def __init__(self, *args, **kwargs):
         specification = kwargs.pop("specification", None)
@@ -70,7 +81,7 @@ class BaseComponentSerializer(serializers.HyperlinkedModelSerializer):
 
     def validate(self, data):
         if self.specification and self.specification.completed:
-            raise serializers.ValidationError("Cannot create/update a component of a completed specification.")
+            raise serializers.ValidationError(self.COMPLETED_SPECIFICATION_MESSAGE)
 
         return data
 
@@ -78,7 +89,7 @@ class BaseComponentSerializer(serializers.HyperlinkedModelSerializer):
 class ComponentSerializer(BaseComponentSerializer):
     class Meta:
         model = Component
-        fields = "__all__"
+        exclude = ("search_vector",)
         read_only_fields = ("specification",)
 
     def validate_group(self, value):
@@ -94,7 +105,78 @@ class PartCodeAssignmentSerializer(BaseComponentSerializer):
         fields = ["part_code"]
 
 
+class PartCodeBulkAssignmentItemSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField()
+
+    class Meta:
+        model = Component
+        fields = ["id", "part_code"]
+        extra_kwargs = {"part_code": {"required": True}}
+
+
+class PartCodeBulkAssignmentSerializer(serializers.Serializer):
+    components = PartCodeBulkAssignmentItemSerializer(many=True, allow_empty=False)
+
+    batch_size = 1000
+
+    def validate_components(self, items):
+        # A component listed more than once gets its last part code and a single result
+        return list({item["id"]: item for item in items}.values())
+
+    @transaction.atomic
+    def assign(self):
+        """Assign the part codes that can be assigned and return the result of each item, in request order."""
+        items = self.validated_data["components"]
+        # The components and their joined specifications are locked, in a stable order, so a concurrent
+        # completion or part write waits for this transaction
+        components = {
+            pk: (specification_id, completed, part_code)
+            for pk, specification_id, completed, part_code in Component.objects.filter(
+                pk__in={item["id"] for item in items}
+            )
+            .select_for_update()
+            .order_by("pk")
+            .values_list("pk", "specification_id", "specification__completed", "part_code")
+        }
+
+        results, part_codes = [], {}
+        for item in items:
+            specification_id, completed, _ = components.get(item["id"], (None, False, None))
+            if specification_id is None:
+                results.append({"id": item["id"], "status": "failed", "errors": ["Component not found."]})
+            elif completed:
+                results.append(
+                    {
+                        "id": item["id"],
+                        "status": "failed",
+                        "errors": [BaseComponentSerializer.COMPLETED_SPECIFICATION_MESSAGE],
+                    }
+                )
+            else:
+                part_codes[item["id"]] = item["part_code"]
+                results.append({"id": item["id"], "status": "part_assigned"})
+
+        now = timezone.now()
+        Component.objects.bulk_update(
+            [Component(pk=pk, part_code=part_code, modified=now) for pk, part_code in part_codes.items()],
+            ["part_code", "modified"],
+            batch_size=self.batch_size,
+        )
+        # bulk_update sends no signals
+        missing_part_counts = Counter()
+        for pk, part_code in part_codes.items():
+            specification_id, _, previous_part_code = components[pk]
+            missing_part_counts[specification_id] += bool(previous_part_code) - bool(part_code)
+        Specification.objects.add_to_counters({}, missing_part_counts)
+        specification_versions.bump(components[pk][0] for pk in part_codes)
+
+        return results
+
+
 class SpecificationCloneSerializer(serializers.Serializer):
+    CLONEABLE_STATUSES = ("Planning Phase", "Planning Ready")
+    NOT_CLONEABLE_MESSAGE = "Only specifications in Planning Phase or Planning Ready can be cloned."
+
     include_parts = serializers.BooleanField(default=False)
 
     def __init__(self, *args, **kwargs):
@@ -106,97 +188,164 @@ class SpecificationCloneSerializer(serializers.Serializer):
         if self.specification is None:
             raise serializers.ValidationError("Specification must be specified.")
 
-        if self.specification.status not in ["Planning Phase", "Planning Ready"]:
-            raise serializers.ValidationError("Only specifications in Planning Phase or Planning Ready can be cloned.")
+        if self.specification.status not in self.CLONEABLE_STATUSES:
+            raise serializers.ValidationError(self.NOT_CLONEABLE_MESSAGE)
 
         return super().validate(data)
 
+    @transaction.atomic
     def clone(self):
-        cloned_specification = deepcopy(self.specification)
         include_parts = self.validated_data.get("include_parts", False)
+        # The status is checked again under a lock, so a concurrent status change can't slip in before the clone
+        specification = Specification.objects.select_for_update().filter(pk=self.specification.pk).first()
+        if specification is None or specification.status not in self.CLONEABLE_STATUSES:
+            raise serializers.ValidationError({"non_field_errors": [self.NOT_CLONEABLE_MESSAGE]})
 
-        cloned_specification.pk = None
-        cloned_specification.status = "Planning Phase" if not include_parts else "Design Phase"
-        cloned_specification.save()
+        return SpecificationCloner().clone(specification, include_parts)
 
-        cloned_groups = {
-            group.name: self.clone_group(group, cloned_specification) for group in self.specification.groups.all()
-        }
-        cloned_components = [
-            self.clone_component(component, cloned_groups[component.group.name], cloned_specification, include_parts)
-            for component in self.specification.components.all()
-        ]
-        Group.objects.bulk_create(cloned_groups.values())
-        Component.objects.bulk_create(cloned_components)
 
-        return cloned_specification
+class SpecificationBatchCloneItemSerializer(SpecificationCloneSerializer):
+    id = serializers.IntegerField()
+
+    def validate(self, data):
+        # The specifications of the whole batch are checked at once by SpecificationBatchCloneSerializer
+        return data
+
+
+class SpecificationBatchCloneSerializer(serializers.Serializer):
+    specifications = SpecificationBatchCloneItemSerializer(many=True, allow_empty=False, max_length=500)
+
+    def validate_specifications(self, value):
+        return self.sources(value, Specification.objects.in_bulk({item["id"] for item in value}))
 
-    def clone_group(self, group, specification):
-        group.pk = None
-        group.specification = specification
+    def sources(self, items, specifications):
+        """Return the ``(specification, include_parts)`` of ``items``, or raise the errors of each item."""
+        errors = []
+        for item in items:
+            specification = specifications.get(item["id"])
+            if specification is None:
+                errors.append({"id": [f"Specification {item['id']} does not exist."]})
+            elif specification.status not in SpecificationCloneSerializer.CLONEABLE_STATUSES:
+                errors.append({"non_field_errors": [SpecificationCloneSerializer.NOT_CLONEABLE_MESSAGE]})
+            else:
+                errors.append({})
 
-        return group
+        if any(errors):
+            raise serializers.ValidationError(errors)
 
-    def clone_component(self, component, group, specification, include_parts):
-        component.pk = None
-        component.group = group
-        if not include_parts:
-            component.part_code = None
-        component.specification = specification
+        return [(specifications[item["id"]], item["include_parts"]) for item in items]
+
+    @transaction.atomic
+    def clone(self):
+        items = [
+            {"id": specification.pk, "include_parts": include_parts}
+            for specification, include_parts in self.validated_data["specifications"]
+        ]
+        # The statuses are checked again under locks, taken in a stable order, so a concurrent status change
+        # can't slip in before the clone
+        specifications = {
+            specification.pk: specification
+            for specification in Specification.objects.select_for_update()
+            .filter(pk__in={item["id"] for item in items})
+            .order_by("pk")
+        }
+        try:
+            sources = self.sources(items, specifications)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({"specifications": exc.detail})
 
-        return component
+        return SpecificationCloner().clone_many(sources)
 
 
 class GroupImportSerializer(GroupSerializer):
     components = ComponentSerializer(many=True)
 
+    def validate_name(self, value):
+        # Checked for the whole payload at once by SpecificationImportSerializer.validate
+        return value
+
 
 class SpecificationImportExportSerializer(SpecificationSerializer):
     groups = GroupImportSerializer(many=True, required=False)
+    components = ComponentSerializer(many=True, required=False, help_text="Components that belong to no group.")
+
+    def validate_completed(self, value):
+        # The components only exist in the payload, so they are checked in validate
+        return value
+
+    def validate(self, data):
+        data = super().validate(data)
+
+        components_data = data.get("components", []) + [
+            component_data for group_data in data.get("groups", []) for component_data in group_data["components"]
+        ]
+        if data.get("completed") and any(not component_data.get("part_code") for component_data in components_data):
+            raise serializers.ValidationError(
+                {"completed": "Cannot complete a specification if any component is missing a part."}
+            )
+
+        return data
 
 
 class SpecificationImportSerializer(serializers.Serializer):
     specifications = SpecificationImportExportSerializer(many=True)
 
+    def validate(self, data):
+        conflicts = group_name_conflicts(data["specifications"])
+        if conflicts:
+            raise serializers.ValidationError(
+                {
+                    "specifications": [
+                        {"groups": conflicts[index]} if index in conflicts else {}
+                        for index in range(len(data["specifications"]))
+                    ]
+                }
+            )
+
+        return data
+
     def create(self, validated_data):
-        specifications_data = validated_data["specifications"]
-        created_specifications = []
+        return SpecificationImporter().save(validated_data["specifications"])
+
 
-        for spec_data in specifications_data:
-            # Extract and pop the nested data for groups
-            groups_data = spec_data.pop("groups", [])
+class SpecificationImportOptionsSerializer(serializers.Serializer):
+    chunk_size = serializers.IntegerField(
+        min_value=1, max_value=10000, default=settings.SPECIFICATION_IMPORT_CHUNK_SIZE
+    )
+    background = serializers.BooleanField(default=False)
 
-            # Create the specification
-            specification = self.create_specification(spec_data)
 
-            # Create nested groups and components
-            self.create_groups(groups_data, specification)
+class SpecificationExportOptionsSerializer(serializers.Serializer):
+    chunk_size = serializers.IntegerField(min_value=1, max_value=10000, default=500)
 
-            created_specifications.append(specification)
 
-        return created_specifications
+class ReportOptionsSerializer(serializers.Serializer):
+    report = serializers.ListField(
+        child=serializers.ChoiceField(choices=list(report_engine.reports)),
+        required=False,
+        help_text="Reports to compute, all of them by default.",
+    )
 
-    def create_specification(self, spec_data):
-        """Create a specification instance."""
-        return Specification.objects.create(**spec_data)
 
-    def create_groups(self, groups_data, specification):
-        """Create group instances and their nested components."""
-        for group_data in groups_data:
-            components_data = group_data.pop("components", [])
-            group = self.create_group(group_data, specification)
+class SearchOptionsSerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=100)
+    specification = serializers.IntegerField(required=False, help_text="Only search this specification.")
 
-            self.create_components(components_data, group, specification)
+    def validate_q(self, value):
+        # Without a word there is nothing for the text search index to match
+        if not re.search(r"\w", value):
+            raise serializers.ValidationError("Enter at least one letter or digit.")
 
-    def create_group(self, group_data, specification):
-        """Create a group instance."""
-        group_serializer = GroupSerializer(data=group_data)
-        group_serializer.is_valid(raise_exception=True)
+        return value
+
+
+class QueuedSpecificationImportSerializer(serializers.Serializer):
+    """Only checks the payload shape; each specification is validated by the worker."""
 
-        return group_serializer.save(specification=specification)
+    specifications = serializers.ListField(child=serializers.DictField())
 
-    def create_components(self, components_data, group=None, specification=None):
-        """Create component instances."""
-        component_serializer = ComponentSerializer(data=components_data, many=True)
-        component_serializer.is_valid(raise_exception=True)
-        component_serializer.save(group=group, specification=specification)
+
+class ImportJobSerializer(serializers.HyperlinkedModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = "__all__"
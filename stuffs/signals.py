@@ -0,0 +1,82 @@
+from collections import Counter
+
+from django.db.models import Count, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import specification_versions
+from .models import BuiltSpecificationCount, Component, Group, Specification
+
+
+@receiver(post_save, sender=Specification)
+def update_built_count_on_save(sender, instance, created, **kwargs):
+    deltas = Counter()
+    if not created and instance.tracker.previous("status") == Specification.STATUS.Built:
+        deltas[instance.tracker.previous("code_number")] -= 1
+    if instance.status == Specification.STATUS.Built:
+        deltas[instance.code_number] += 1
+
+    BuiltSpecificationCount.objects.add(deltas)
+
+
+@receiver(post_delete, sender=Specification)
+def update_built_count_on_delete(sender, instance, **kwargs):
+    if instance.status == Specification.STATUS.Built:
+        BuiltSpecificationCount.objects.add({instance.code_number: -1})
+
+
+@receiver(post_save, sender=Specification)
+@receiver(post_delete, sender=Specification)
+def bump_specification_version(sender, instance, **kwargs):
+    specification_versions.bump([instance.pk])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Component)
+def bump_parent_specification_version(sender, instance, **kwargs):
+    # A row moved to another specification changes both trees
+    specification_versions.bump([instance.specification_id, instance.tracker.previous("specification_id")])
+
+
+def deleted_model(origin):
+    """The model whose ``delete()`` started a deletion (``origin`` is an instance or a queryset)."""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+@receiver(post_save, sender=Component)
+def update_specification_counters_on_save(sender, instance, created, **kwargs):
+    component_counts, missing_part_counts = Counter(), Counter()
+    if not created:
+        previous_specification_id = instance.tracker.previous("specification_id")
+        component_counts[previous_specification_id] -= 1
+        missing_part_counts[previous_specification_id] -= not instance.tracker.previous("part_code")
+    component_counts[instance.specification_id] += 1
+    missing_part_counts[instance.specification_id] += instance.missing_part
+
+    Specification.objects.add_to_counters(component_counts, missing_part_counts)
+
+
+@receiver(post_delete, sender=Component)
+def update_specification_counters_on_delete(sender, instance, origin, **kwargs):
+    # Cascades are counted once per group below, or not at all when the specification goes too
+    if deleted_model(origin) is not Component:
+        return
+
+    Specification.objects.add_to_counters(
+        {instance.specification_id: -1}, {instance.specification_id: -instance.missing_part}
+    )
+
+
+@receiver(pre_delete, sender=Group)
+def update_specification_counters_on_group_delete(sender, instance, origin, **kwargs):
+    if deleted_model(origin) is Specification:
+        return
+
+    counts = instance.components.aggregate(
+        components=Count("pk"), missing_parts=Count("pk", filter=Component.MISSING_PART)
+    )
+    Specification.objects.add_to_counters(
+        {instance.specification_id: -counts["components"]}, {instance.specification_id: -counts["missing_parts"]}
+    )
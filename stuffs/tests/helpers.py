@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+
+
+class local_specification_cache(override_settings):
+    """
+    Enable a specification cache local to the test process, which is off by default.
+
+    It starts empty: entries cached by an earlier test could match the rolled back rows of this one.
+    """
+
+    def __init__(self):
+        backend = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "specifications"}
+        super().__init__(CACHES={**settings.CACHES, "specifications": backend})
+
+    def enable(self):
+        super().enable()
+        caches["specifications"].clear()
+
+    def decorate_class(self, cls):
+        cls = super().decorate_class(cls)
+        set_up = cls.setUp
+
+        def setUp(test):
+            caches["specifications"].clear()
+            set_up(test)
+
+        cls.setUp = setUp
+
+        return cls
+
+
+def create_specification(size, **kwargs):
+    """A specification with ``size`` groups of ``size`` components each."""
+    specification = SpecificationFactory(**kwargs)
+    for group in GroupFactory.create_batch(size, specification=specification):
+        ComponentFactory.create_batch(size, group=group, specification=specification)
+
+    return specification
+
+
+class QueryCountMixin:
+    def count_queries(self, send, status_code=status.HTTP_200_OK):
+        """Return the number of queries of the request sent by ``send()``."""
+        with CaptureQueriesContext(connection) as queries:
+            response = send()
+        self.assertEqual(response.status_code, status_code)
+
+        return len(queries)
+
+    def assertConstantQueries(self, send, small, large, status_code=status.HTTP_200_OK):
+        """``send(payload)`` must run as many queries for the ``large`` payload as for the ``small`` one."""
+        small_count = self.count_queries(lambda: send(small), status_code)
+        large_count = self.count_queries(lambda: send(large), status_code)
+        self.assertEqual(small_count, large_count, f"{large_count} queries for {large!r}, {small_count} for {small!r}")
@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..factories import ComponentFactory, SpecificationFactory
+from ..models import Component
+from .helpers import QueryCountMixin
+
+
+class AssignPartsTest(QueryCountMixin, TestCase):
+    url = "/api/stuffs/components/assign_parts/"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory()
+        self.components = ComponentFactory.create_batch(3, specification=self.specification, part_code=None)
+
+    def assign_parts(self, items):
+        return self.client.patch(self.url, {"components": items}, format="json")
+
+    def test_assign_parts(self):
+        response = self.assign_parts(
+            [{"id": component.pk, "part_code": f"P-{index}"} for index, component in enumerate(self.components)]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["assigned"], 3)
+        self.assertEqual(
+            list(Component.objects.order_by("pk").values_list("part_code", flat=True)), ["P-0", "P-1", "P-2"]
+        )
+
+    def test_per_item_results(self):
+        completed_component = ComponentFactory(specification=SpecificationFactory(completed=True), part_code="OLD")
+
+        response = self.assign_parts(
+            [
+                {"id": self.components[0].pk, "part_code": "P-0"},
+                {"id": completed_component.pk, "part_code": "NEW"},
+                {"id": 0, "part_code": "P-X"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["assigned"], 1)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]], ["part_assigned", "failed", "failed"]
+        )
+        completed_component.refresh_from_db()
+        self.assertEqual(completed_component.part_code, "OLD")
+
+        response = self.assign_parts([{"id": 0, "part_code": "P-X"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_duplicate_ids(self):
+        response = self.assign_parts(
+            [
+                {"id": self.components[0].pk, "part_code": "P-0"},
+                {"id": self.components[1].pk, "part_code": "P-1"},
+                {"id": self.components[0].pk, "part_code": "P-2"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["assigned"], 2)
+        self.assertEqual(
+            [result["id"] for result in response.data["results"]], [component.pk for component in self.components[:2]]
+        )
+        self.components[0].refresh_from_db()
+        self.assertEqual(self.components[0].part_code, "P-2")
+        self.specification.refresh_from_db()
+        self.assertEqual(self.specification.missing_part_count, 1)
+
+    def test_components_are_locked(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assign_parts([{"id": self.components[0].pk, "part_code": "P-0"}])
+
+        locks = [query["sql"] for query in queries if "FOR UPDATE" in query["sql"]]
+        self.assertEqual(len(locks), 1 if connection.features.has_select_for_update else 0)
+
+    def test_invalid_payload(self):
+        response = self.assign_parts([{"id": self.components[0].pk}])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("part_code", response.data["components"][0])
+
+    def test_query_count_does_not_grow_with_items(self):
+        self.assertConstantQueries(
+            lambda components: self.assign_parts([{"id": component.pk, "part_code": "P"} for component in components]),
+            self.components[:1],
+            ComponentFactory.create_batch(20, specification=self.specification, part_code=None),
+        )
@@ -0,0 +1,59 @@
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory()
+        self.group = GroupFactory(specification=self.specification)
+        ComponentFactory.create_batch(3, specification=self.specification, group=self.group)
+        SpecificationFactory.create_batch(2)
+        self.urls = [
+            "specifications/",
+            "specifications/?page_size=2",
+            f"specifications/{self.specification.pk}/",
+            f"specifications/{self.specification.pk}/groups/",
+            f"specifications/{self.specification.pk}/components/?page_size=2",
+        ]
+
+    def test_same_responses_as_the_sync_endpoints(self):
+        for url in self.urls:
+            sync_response = self.client.get(f"/api/stuffs/{url}")
+            async_response = self.client.get(f"/api/stuffs/async/{url}")
+
+            self.assertEqual(async_response.status_code, status.HTTP_200_OK, url)
+            self.assertEqual(
+                async_response.json(), sync_response.json() | self.relative_links(sync_response.json(), url)
+            )
+
+    def relative_links(self, data, url):
+        # Pagination links point back at the endpoint that was called
+        return {
+            name: data[name].replace("/api/stuffs/", "/api/stuffs/async/")
+            for name in ["next", "previous"]
+            if isinstance(data, dict) and data.get(name)
+        }
+
+    def test_pages(self):
+        first_page = self.client.get("/api/stuffs/async/specifications/?page_size=2").json()
+        second_page = self.client.get(first_page["next"]).json()
+
+        self.assertEqual(len(first_page["results"] + second_page["results"]), 3)
+        self.assertIsNone(second_page["next"])
+
+    def test_not_found(self):
+        for url in ["specifications/0/", "specifications/0/groups/", "specifications/0/components/"]:
+            response = self.client.get(f"/api/stuffs/async/{url}")
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertEqual(response.json(), {"detail": "Not found."})
+
+    async def test_served_without_a_thread(self):
+        response = await self.async_client.get(f"/api/stuffs/async/specifications/{self.specification.pk}/groups/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["name"], self.group.name)
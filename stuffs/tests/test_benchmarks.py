@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from core.management.commands.benchmark_endpoints import MARKER_TABLE, Command
+
+from ..models import Component, Group, Specification
+from ..seeding import DatasetGenerator, seed_dataset
+
+
+class DatasetGeneratorTest(TestCase):
+    def test_same_seed_same_dataset(self):
+        generator = DatasetGenerator(250, seed=3, components_per_specification=100)
+
+        self.assertEqual(list(generator.specifications()), list(DatasetGenerator(250, seed=3).specifications()))
+        self.assertNotEqual(list(generator.specifications()), list(DatasetGenerator(250, seed=4).specifications()))
+
+    def test_seed_dataset(self):
+        generator = DatasetGenerator(250, components_per_specification=100, groups_per_specification=5)
+
+        self.assertEqual(seed_dataset(generator, chunk_size=2)["specifications"], 3)
+
+        self.assertEqual(Specification.objects.count(), 3)
+        self.assertEqual(Group.objects.count(), 15)
+        self.assertEqual(Component.objects.count(), 250)
+        self.assertEqual(Component.objects.filter(group=None).count(), 25)
+        self.assertEqual(sorted(Specification.objects.values_list("component_count", flat=True)), [50, 100, 100])
+
+
+class SeedTest(TransactionTestCase):
+    """Seeding flushes the database, which PostgreSQL refuses inside the transaction of a ``TestCase``."""
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {MARKER_TABLE}")
+
+    def seed(self, generator):
+        command = Command(stdout=StringIO())
+        command.seed(generator, workers=1)
+
+        return command.stdout.getvalue()
+
+    def test_reused_for_the_same_seed_and_shape(self):
+        self.seed(DatasetGenerator(200, seed=1))
+
+        self.assertIn("Reusing", self.seed(DatasetGenerator(200, seed=1)))
+        self.assertNotIn("Reusing", self.seed(DatasetGenerator(200, seed=2)))
+        self.assertNotIn("Reusing", self.seed(DatasetGenerator(200, seed=2, components_per_specification=50)))
+        self.assertEqual(Specification.objects.count(), 4)
+
+    def test_run_restores_the_dataset(self):
+        self.seed(DatasetGenerator(200, seed=1))
+        rows = [(model, list(model.objects.values_list("pk", flat=True))) for model in [Specification, Component]]
+        part_codes = list(Component.objects.order_by("pk").values_list("part_code", flat=True))
+
+        Command(stdout=StringIO()).run(iterations=2)
+
+        for model, pks in rows:
+            self.assertCountEqual(model.objects.values_list("pk", flat=True), pks)
+        self.assertEqual(list(Component.objects.order_by("pk").values_list("part_code", flat=True)), part_codes)
+
+
+class CompareTest(TestCase):
+    meta = {"vendor": "sqlite", "scale": "1k", "with_cache": False}
+
+    def setUp(self):
+        self.command = Command(stdout=StringIO())
+
+    def results(self, p50_ms, queries):
+        return {"meta": self.meta, "endpoints": {"specification-list": {"p50_ms": p50_ms, "queries": queries}}}
+
+    def test_within_threshold(self):
+        self.command.compare(self.results(10.0, 3), self.results(11.9, 3), threshold=0.2)
+
+    def test_slower(self):
+        with self.assertRaisesMessage(CommandError, "specification-list"):
+            self.command.compare(self.results(10.0, 3), self.results(12.1, 3), threshold=0.2)
+
+    def test_more_queries(self):
+        with self.assertRaisesMessage(CommandError, "specification-list"):
+            self.command.compare(self.results(10.0, 3), self.results(9.0, 4), threshold=0.2)
+
+    def test_zero_baseline(self):
+        self.command.compare(self.results(0.0, 3), self.results(0.0, 3), threshold=0.2)
+        with self.assertRaisesMessage(CommandError, "specification-list"):
+            self.command.compare(self.results(0.0, 3), self.results(0.1, 3), threshold=0.2)
+
+    def test_different_scale(self):
+        baseline = self.results(10.0, 3)
+        baseline["meta"] = {**self.meta, "scale": "100k"}
+
+        with self.assertRaisesMessage(CommandError, "different scale"):
+            self.command.compare(baseline, self.results(10.0, 3), threshold=0.2)
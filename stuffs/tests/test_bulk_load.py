@@ -0,0 +1,160 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..exporters import SpecificationTreeExporter, ndjson_export
+from ..factories import GroupFactory
+from ..importers import BulkSpecificationLoad, TreeValidator
+from ..models import BuiltSpecificationCount, Component, Group, Specification
+
+
+def tree(name, status="Planning Phase", groups=(), **extra):
+    return {
+        "name": name,
+        "code_number": "SPEC001",
+        "status": status,
+        "groups": [
+            {
+                "name": group_name,
+                "group_code": "GRP",
+                "components": [{"name": f"{group_name} component", "description": "Grouped", "part_code": "P1"}],
+            }
+            for group_name in groups
+        ],
+        "components": [{"name": f"{name} component", "description": "Ungrouped", "part_code": None}],
+        **extra,
+    }
+
+
+class TreeValidatorTest(TestCase):
+    def test_valid(self):
+        data, errors = TreeValidator().validate({**tree("Spec", groups=["Group"]), "completed": False})
+
+        self.assertEqual(errors, {})
+        self.assertEqual(data["groups"][0]["components"][0]["part_code"], "P1")
+
+    def test_defaults(self):
+        data, errors = TreeValidator().validate(
+            {"name": " Spec ", "code_number": "SPEC001", "components": [{"name": "C", "description": "D"}]}
+        )
+
+        self.assertEqual(errors, {})
+        self.assertEqual(data["name"], "Spec")
+        self.assertEqual(data["status"], "Planning Phase")
+        self.assertFalse(data["completed"])
+        self.assertIsNone(data["components"][0]["part_code"])
+        self.assertEqual(data["groups"], [])
+
+    def test_errors(self):
+        _, errors = TreeValidator().validate(
+            {
+                "name": "",
+                "code_number": "x" * 51,
+                "status": "Done",
+                "completed": True,
+                "groups": [{"name": "Group", "group_code": "G"}],
+                "components": [{"name": "C", "description": "D"}, "C"],
+            }
+        )
+
+        self.assertEqual(
+            errors,
+            {
+                "name": ["This field may not be blank."],
+                "code_number": ["Ensure this field has no more than 50 characters."],
+                "status": ['"Done" is not a valid choice.'],
+                "groups.0.components": ["This field is required."],
+                "components.1.non_field_errors": ["Invalid data. Expected a dictionary."],
+                "completed": ["Cannot complete a specification if any component is missing a part."],
+            },
+        )
+
+
+class BulkSpecificationLoadTest(TestCase):
+    def lines(self, *trees):
+        return [json.dumps(spec_data) + "\n" for spec_data in trees]
+
+    def test_load(self):
+        GroupFactory(name="Taken")
+
+        load = BulkSpecificationLoad(chunk_size=2).run(
+            self.lines(
+                tree("Spec 1", groups=["Group 1", "Group 2"]),
+                tree("Spec 2", status="Built", groups=["Group 1"]),
+                tree("Spec 3", groups=["Taken"]),
+                tree("", groups=["Group 3"]),
+                tree("Spec 5", status="Built", groups=["Group 5"]),
+            )
+            + ["{not json\n", "\n"]
+        )
+
+        self.assertEqual((load.lines, load.imported), (6, 2))
+        self.assertEqual([error["line"] for error in load.errors], [2, 3, 4, 6])
+        self.assertEqual(
+            load.errors[0]["errors"],
+            {"groups": ["The group name 'Group 1' is already in use by another specification."]},
+        )
+        self.assertEqual(load.errors[2]["errors"], {"name": ["This field may not be blank."]})
+
+        self.assertQuerysetEqual(
+            Specification.objects.filter(name__startswith="Spec").order_by("name"), ["Spec 1", "Spec 5"], transform=str
+        )
+        self.assertEqual(Group.objects.filter(specification__name="Spec 1").count(), 2)
+        self.assertEqual(Component.objects.filter(specification__name="Spec 1", group=None).count(), 1)
+        self.assertEqual(Component.objects.filter(specification__name="Spec 1", group__name="Group 2").count(), 1)
+        self.assertFalse(Specification.objects.drifted_counters().exists())
+        self.assertEqual(Specification.objects.get(name="Spec 1").missing_part_count, 1)
+        self.assertEqual(BuiltSpecificationCount.objects.get(code_number="SPEC001").built_count, 1)
+
+    def test_group_name_repeated_in_a_tree(self):
+        GroupFactory(name="Taken")
+
+        load = BulkSpecificationLoad().run(
+            self.lines(
+                tree("Spec 1", groups=["Group 1", "Group 1"]),
+                tree("Spec 2", groups=["Taken", "Taken", "Group 2"]),
+                tree("Spec 3", groups=["Group 3"]),
+            )
+        )
+
+        self.assertEqual(load.imported, 1)
+        self.assertEqual(
+            load.errors,
+            [
+                {
+                    "line": 1,
+                    "errors": {
+                        "groups": ["The group name 'Group 1' is used by more than one group of the specification."]
+                    },
+                },
+                {
+                    "line": 2,
+                    "errors": {"groups": ["The group name 'Taken' is already in use by another specification."]},
+                },
+            ],
+        )
+
+    def test_round_trip(self):
+        BulkSpecificationLoad().run(self.lines(tree("Spec 1", groups=["Group 1"]), tree("Spec 2", status="Built")))
+        exported = "".join(ndjson_export(SpecificationTreeExporter().chunks()))
+
+        Specification.objects.all().delete()
+        BulkSpecificationLoad().run(StringIO(exported))
+
+        self.assertEqual("".join(ndjson_export(SpecificationTreeExporter().chunks())), exported)
+
+
+class BulkLoadCommandTest(TestCase):
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as feed:
+            feed.writelines([json.dumps(tree("Spec 1")) + "\n", json.dumps(tree("")) + "\n"])
+            feed.flush()
+
+            with self.assertRaisesMessage(CommandError, "1 lines were rejected"):
+                call_command("bulk_load_specifications", feed.name, stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(Specification.objects.get().name, "Spec 1")
@@ -0,0 +1,74 @@
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from ..factories import SpecificationFactory
+from ..models import Specification
+from ..serializers import SpecificationBatchCloneSerializer
+from .helpers import QueryCountMixin, create_specification
+
+
+class CloneSpecificationsBatchTest(QueryCountMixin, TestCase):
+    url = "/api/stuffs/specifications/clone_batch/"
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def clone_batch(self, items):
+        return self.client.post(self.url, {"specifications": items}, format="json")
+
+    def test_clone_batch(self):
+        first = create_specification(2)
+        second = create_specification(1, status="Planning Ready")
+
+        response = self.clone_batch([{"id": second.pk, "include_parts": True}, {"id": first.pk}, {"id": second.pk}])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        cloned_ids = response.data["cloned"]
+        self.assertEqual(len(cloned_ids), 3)
+
+        clones = Specification.objects.in_bulk(cloned_ids)
+        self.assertEqual(
+            [(clones[pk].name, clones[pk].status) for pk in cloned_ids],
+            [(second.name, "Design Phase"), (first.name, "Planning Phase"), (second.name, "Planning Phase")],
+        )
+        self.assertEqual(clones[cloned_ids[1]].groups.count(), 2)
+        self.assertEqual(clones[cloned_ids[1]].components.count(), 4)
+        self.assertFalse(clones[cloned_ids[2]].components.exclude(part_code=None).exists())
+        self.assertFalse(clones[cloned_ids[0]].components.filter(part_code=None).exists())
+
+    def test_clone_batch_is_all_or_nothing(self):
+        cloneable = create_specification(1)
+        built = SpecificationFactory(status="Built")
+
+        response = self.clone_batch([{"id": cloneable.pk}, {"id": built.pk}, {"id": 0}])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data["specifications"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("non_field_errors", errors[1])
+        self.assertIn("id", errors[2])
+        self.assertEqual(Specification.objects.count(), 2)
+
+    def test_clone_batch_checks_the_statuses_again(self):
+        cloneable, changed = create_specification(1), create_specification(1)
+        serializer = SpecificationBatchCloneSerializer(
+            data={"specifications": [{"id": cloneable.pk}, {"id": changed.pk}]}
+        )
+        self.assertTrue(serializer.is_valid())
+        # Changed by another request after the validation
+        Specification.objects.filter(pk=changed.pk).update(status="Built")
+
+        with self.assertRaises(ValidationError) as context:
+            serializer.clone()
+        self.assertEqual(context.exception.detail["specifications"][0], {})
+        self.assertEqual(Specification.objects.count(), 2)
+
+    def test_clone_batch_query_count_does_not_grow_with_batch_size(self):
+        self.assertConstantQueries(
+            lambda specifications: self.clone_batch([{"id": specification.pk} for specification in specifications]),
+            [create_specification(1)],
+            [create_specification(3) for _ in range(5)],
+            status.HTTP_201_CREATED,
+        )
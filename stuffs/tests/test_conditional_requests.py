@@ -0,0 +1,91 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+from .helpers import local_specification_cache
+
+
+@local_specification_cache()
+class ConditionalRequestsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory()
+        self.group = GroupFactory(specification=self.specification)
+        self.component = ComponentFactory(specification=self.specification, group=self.group)
+        self.url = f"/api/stuffs/specifications/{self.specification.pk}/"
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Last-Modified", response)
+
+        return response["ETag"]
+
+    def test_if_none_match(self):
+        for url in [self.url, f"{self.url}groups/", f"{self.url}components/", f"/api/stuffs/groups/{self.group.pk}/"]:
+            etag = self.get_etag(url)
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(response.content, b"")
+            self.assertEqual(response["ETag"], etag)
+
+    def test_not_modified_skips_the_tables(self):
+        etag = self.get_etag(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse([query for query in queries if "stuffs_" in query["sql"]])
+
+    def test_tree_changes_change_the_etag(self):
+        etag = self.get_etag(self.url)
+
+        ComponentFactory(specification=self.specification, group=self.group)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        etag = self.get_etag(self.url)
+        self.component.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_pages_have_their_own_etag(self):
+        url = f"{self.url}components/"
+        self.assertNotEqual(self.get_etag(url), self.get_etag(f"{url}?page_size=1"))
+
+    def test_if_modified_since(self):
+        url = f"/api/stuffs/components/{self.component.pk}/"
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_deletion_with_if_modified_since(self):
+        component = ComponentFactory(specification=self.specification, group=self.group)
+        last_modified = self.client.get(f"/api/stuffs/components/{component.pk}/")["Last-Modified"]
+        component.delete()
+
+        for url in [self.url, f"{self.url}groups/", f"{self.url}components/", f"/api/stuffs/groups/{self.group.pk}/"]:
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertNotIn("Last-Modified", response)
+
+    def test_if_match(self):
+        etag = self.get_etag(self.url)
+        self.client.patch(f"/api/stuffs/groups/{self.group.pk}/", {"name": "Renamed group"}, format="json")
+
+        response = self.client.patch(self.url, {"name": "Stale edit"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.specification.refresh_from_db()
+        self.assertNotEqual(self.specification.name, "Stale edit")
+
+        etag = self.get_etag(self.url)
+        response = self.client.patch(self.url, {"name": "Fresh edit"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response["ETag"], self.get_etag(self.url))
@@ -1,8 +1,12 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from ..factories import SpecificationFactory
+from ..models import BuiltSpecificationCount, Specification
 
 
 class BuiltSpecificationsReportTest(TestCase):
@@ -19,9 +23,57 @@ class BuiltSpecificationsReportTest(TestCase):
     def test_export_built_specification_report(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        content = response.content.decode("utf-8")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="built_specifications_report.csv"')
+        content = b"".join(response.streaming_content).decode("utf-8")
         lines = content.split("\n")
         self.assertEqual(lines[0], "Specification Code,Number of Built Specifications")
         self.assertIn("SPEC001,2", lines)
         self.assertIn("SPEC002,1", lines)
         self.assertNotIn("SPEC003", lines)
+
+
+class BuiltSpecificationCountTest(TestCase):
+    def counts(self):
+        return dict(Specification.reports.built_count().values_list("code_number", "built_count"))
+
+    def test_counts_follow_status_changes(self):
+        spec = SpecificationFactory(code_number="SPEC001", status="Built")
+        SpecificationFactory(code_number="SPEC001", status="Built")
+        self.assertEqual(self.counts(), {"SPEC001": 2})
+
+        spec.code_number = "SPEC002"
+        spec.save()
+        self.assertEqual(self.counts(), {"SPEC001": 1, "SPEC002": 1})
+
+        spec.status = "Building Phase"
+        spec.save()
+        self.assertEqual(self.counts(), {"SPEC001": 1})
+
+        spec.status = "Built"
+        spec.save()
+        spec.delete()
+        self.assertEqual(self.counts(), {"SPEC001": 1})
+
+    def test_counts_include_imported_specifications(self):
+        payload = {
+            "specifications": [
+                {"name": "Specification 1", "code_number": "SPEC001", "status": "Built"},
+                {"name": "Specification 2", "code_number": "SPEC001", "status": "Built"},
+                {"name": "Specification 3", "code_number": "SPEC002", "status": "Planning Phase"},
+            ]
+        }
+        response = APIClient().post("/api/stuffs/specifications/import_data/", data=payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.counts(), {"SPEC001": 2})
+
+    def test_rebuild_command(self):
+        SpecificationFactory(code_number="SPEC001", status="Built")
+        BuiltSpecificationCount.objects.update(built_count=5)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_built_counts", "--check", stdout=StringIO())
+
+        call_command("rebuild_built_counts", stdout=StringIO())
+        self.assertEqual(self.counts(), {"SPEC001": 1})
+        call_command("rebuild_built_counts", "--check", stdout=StringIO())
@@ -0,0 +1,95 @@
+from django.db import connection
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..exporters import SpecificationTreeExporter
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+from ..models import Component, Group, Specification
+
+
+class ExportSpecificationsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/stuffs/specifications/export_data/"
+
+        for specification in SpecificationFactory.create_batch(3):
+            for group in GroupFactory.create_batch(2, specification=specification):
+                ComponentFactory.create_batch(2, group=group, specification=specification)
+            ComponentFactory(group=None, specification=specification, part_code=None)
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+
+        return response, b"".join(response.streaming_content).decode()
+
+    def snapshot(self):
+        return sorted(
+            (
+                specification.name,
+                sorted((group.name, group.group_code) for group in specification.groups.all()),
+                sorted(
+                    (component.name, component.part_code or "", component.group.name if component.group else "")
+                    for component in specification.components.all()
+                ),
+            )
+            for specification in Specification.objects.all()
+        )
+
+    def test_export_json_round_trips_through_import(self):
+        before = self.snapshot()
+        response, content = self.export(self.url)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+        Specification.objects.all().delete()
+        response = self.client.post(
+            "/api/stuffs/specifications/import_data/", data=content, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_export_ndjson_round_trips_through_import_stream(self):
+        before = self.snapshot()
+        response, content = self.export(f"{self.url}?format=ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(content.splitlines()), 3)
+
+        Specification.objects.all().delete()
+        response = self.client.post(
+            "/api/stuffs/specifications/import_stream/", data=content, content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(Group.objects.count(), 6)
+        self.assertEqual(Component.objects.filter(group=None).count(), 3)
+
+    def test_export_queries_per_chunk(self):
+        response = self.client.get(f"{self.url}?format=ndjson&chunk_size=2")
+
+        # Two chunks of three queries each, plus the query that finds no more specifications
+        with self.assertNumQueries(7):
+            b"".join(response.streaming_content)
+
+    def test_group_created_while_exporting(self):
+        specification = Specification.objects.order_by("id").first()
+        created = []
+
+        def create_group(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            # Right after the groups are read, before the components are
+            if 'FROM "stuffs_group"' in sql and not created:
+                group = GroupFactory(specification=specification)
+                created.append(ComponentFactory(group=group, specification=specification))
+            return result
+
+        exporter = SpecificationTreeExporter(Specification.objects.filter(pk=specification.pk))
+        with connection.execute_wrapper(create_group):
+            (tree,) = exporter
+
+        self.assertTrue(created)
+        # Exported under its group if that was read in time, never as an ungrouped component
+        self.assertEqual(len(tree["components"]), 1)
@@ -0,0 +1,43 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.serializers import stock_hyperlinked_serializer
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+from ..serializers import ComponentSerializer, GroupSerializer, SpecificationSerializer
+
+
+class CachedHyperlinksTest(TestCase):
+    def setUp(self):
+        self.specification = SpecificationFactory()
+        self.group = GroupFactory(specification=self.specification)
+        ComponentFactory(specification=self.specification, group=self.group)
+        ComponentFactory(specification=self.specification, group=None)
+
+    def test_same_urls_as_the_stock_fields(self):
+        request = Request(APIRequestFactory().get("/", HTTP_HOST="testserver:8000", secure=True))
+        querysets = {
+            SpecificationSerializer: [self.specification],
+            GroupSerializer: list(self.specification.groups.all()),
+            ComponentSerializer: list(self.specification.components.all()),
+        }
+
+        for serializer_class, instances in querysets.items():
+            for context in [{"request": request}, {"request": None}]:
+                data = serializer_class(instances, many=True, context=context).data
+
+                self.assertEqual(
+                    data, stock_hyperlinked_serializer(serializer_class)(instances, many=True, context=context).data
+                )
+                self.assertTrue(all(row["url"] for row in data))
+
+    def test_benchmark_command(self):
+        stdout = StringIO()
+
+        call_command("benchmark_hyperlinks", "--rows", "10", "--repeat", "1", stdout=stdout)
+
+        self.assertIn("Speedup", stdout.getvalue())
@@ -0,0 +1,113 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..importers import ChunkedSpecificationImport
+from ..jobs import claim_import_job, enqueue_import_job, run_import_job
+from ..models import Component, Group, ImportJob, Specification
+
+
+class ImportJobTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/stuffs/specifications/import_data/?background=true&chunk_size=2"
+        self.specifications = [
+            {
+                "name": f"Specification {index}",
+                "code_number": "SPEC001",
+                "status": "Planning Phase",
+                "groups": [
+                    {
+                        "name": f"Group {index}",
+                        "group_code": "GRP001",
+                        "components": [{"name": "Component 1", "description": "This is component 1"}],
+                    }
+                ],
+            }
+            for index in range(3)
+        ]
+
+    def test_import_data_in_background(self):
+        self.specifications[1]["name"] = ""
+        response = self.client.post(self.url, data={"specifications": self.specifications}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(Specification.objects.count(), 0)
+        job = ImportJob.objects.get()
+        self.assertEqual((job.status, job.total_lines, job.chunk_size), ("Queued", 3, 2))
+        # Spooled one chunk per row
+        self.assertEqual(job.chunks.count(), 2)
+
+        call_command("process_import_jobs", "--burst", stdout=StringIO())
+
+        response = self.client.get(f"/api/stuffs/import_jobs/{job.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "Completed")
+        self.assertEqual(response.data["processed_lines"], 3)
+        self.assertEqual(response.data["imported_count"], 2)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [2])
+        self.assertNotIn("payload", response.data)
+        self.assertEqual(Specification.objects.count(), 2)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Component.objects.count(), 2)
+
+    def test_import_data_in_background_invalid_payload(self):
+        response = self.client.post(self.url, data={"specifications": "nope"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ImportJob.objects.exists())
+
+    def test_claimed_job_is_not_claimed_again(self):
+        job = enqueue_import_job([json.dumps(spec_data) for spec_data in self.specifications], chunk_size=10)
+
+        self.assertEqual(claim_import_job("worker-1"), job)
+        self.assertIsNone(claim_import_job("worker-2"))
+
+    def test_resume_job_from_processed_lines(self):
+        job = enqueue_import_job([json.dumps(spec_data) for spec_data in self.specifications], chunk_size=1)
+        ImportJob.objects.filter(pk=job.pk).update(status="Running", processed_lines=2, imported_count=2)
+
+        call_command("process_import_jobs", "--burst", "--stale-after=0", stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_lines, job.imported_count), ("Completed", 3, 3))
+        self.assertEqual(list(Specification.objects.values_list("name", flat=True)), ["Specification 2"])
+
+    def test_run_stops_once_the_job_is_claimed_again(self):
+        job = enqueue_import_job([json.dumps(spec_data) for spec_data in self.specifications], chunk_size=1)
+        job = claim_import_job("worker-1")
+        # Stalled, then claimed and advanced by another worker while this one is still alive
+        ImportJob.objects.filter(pk=job.pk).update(worker="worker-2", processed_lines=1, imported_count=1)
+
+        run_import_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.processed_lines), ("Running", "worker-2", 1))
+        self.assertFalse(Specification.objects.exists())
+
+    def test_failed_even_if_the_error_cannot_be_recorded(self):
+        enqueue_import_job([json.dumps(spec_data) for spec_data in self.specifications], chunk_size=1)
+        job = claim_import_job("worker-1")
+
+        with mock.patch.object(ChunkedSpecificationImport, "import_chunk", side_effect=RuntimeError("Broken")):
+            with mock.patch.object(ImportJob, "save", side_effect=DatabaseError("Unavailable")):
+                run_import_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_lines), ("Failed", 0))
+
+    @override_settings(SPECIFICATION_IMPORT_MAX_ERRORS=1)
+    def test_errors_are_capped(self):
+        lines = ["{not json"] * 3 + [json.dumps(self.specifications[0])]
+        job = enqueue_import_job(lines, chunk_size=1)
+
+        call_command("process_import_jobs", "--burst", stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.imported_count, job.error_count), ("Completed", 1, 3))
+        self.assertEqual([error["line"] for error in job.errors], [1])
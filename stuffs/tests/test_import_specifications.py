@@ -1,7 +1,14 @@
-from django.test import TestCase
+import json
+from copy import deepcopy
+
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from ..factories import GroupFactory
 from ..models import Component, Group, Specification
 
 
@@ -52,3 +59,137 @@ class ImportSpecificationsTest(TestCase):
         }
         response = self.client.post(self.url, data=invalid_payload, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_specifications_group_name_in_use(self):
+        GroupFactory(name="Group 1")
+        response = self.client.post(self.url, data=self.valid_payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Group.objects.count(), 1)
+
+    def test_import_specifications_group_name_shared_between_specifications(self):
+        second_specification = deepcopy(self.valid_payload["specifications"][0])
+        second_specification["groups"] = second_specification["groups"][:1]
+        self.valid_payload["specifications"].append(second_specification)
+
+        response = self.client.post(self.url, data=self.valid_payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Specification.objects.count(), 0)
+
+    def test_import_specifications_group_name_repeated(self):
+        groups = self.valid_payload["specifications"][0]["groups"]
+        groups.append({**groups[0], "group_code": "GRP009"})
+
+        response = self.client.post(self.url, data=self.valid_payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["specifications"][0]["groups"],
+            [f"The group name '{groups[0]['name']}' is used by more than one group of the specification."],
+        )
+        self.assertEqual(Specification.objects.count(), 0)
+
+    def test_import_completed_specification_missing_part(self):
+        specification = self.valid_payload["specifications"][0]
+        specification["completed"] = True
+        specification["groups"][0]["components"][0]["part_code"] = ""
+
+        response = self.client.post(self.url, data=self.valid_payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_specifications_query_count(self):
+        with CaptureQueriesContext(connection) as single_import:
+            self.client.post(self.url, data=self.valid_payload, format="json")
+
+        payload = {"specifications": []}
+        for index in range(20):
+            specification = deepcopy(self.valid_payload["specifications"][0])
+            for group in specification["groups"]:
+                group["name"] = f"{group['name']} {index}"
+            payload["specifications"].append(specification)
+
+        with self.assertNumQueries(len(single_import)):
+            response = self.client.post(self.url, data=payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Specification.objects.count(), 21)
+        self.assertEqual(Group.objects.count(), 42)
+        self.assertEqual(Component.objects.count(), 63)
+        self.assertFalse(Component.objects.exclude(specification=F("group__specification")).exists())
+
+
+class ImportSpecificationsStreamTest(TransactionTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/stuffs/specifications/import_stream/"
+
+    def specification_line(self, name, group_name):
+        return json.dumps(
+            {
+                "name": name,
+                "code_number": "SPEC001",
+                "status": "Planning Phase",
+                "groups": [
+                    {
+                        "name": group_name,
+                        "group_code": "GRP001",
+                        "components": [{"name": "Component 1", "description": "This is component 1"}],
+                    }
+                ],
+            }
+        )
+
+    def post_lines(self, lines, **params):
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return self.client.post(
+            f"{self.url}?{query}", data="\n".join(lines).encode(), content_type="application/x-ndjson"
+        )
+
+    def test_import_stream_success(self):
+        lines = [self.specification_line(f"Specification {index}", f"Group {index}") for index in range(5)]
+        response = self.post_lines(lines, chunk_size=2)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {"lines": 5, "imported": 5, "error_count": 0, "errors": []})
+        self.assertEqual(Specification.objects.count(), 5)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Component.objects.count(), 5)
+
+    def test_import_stream_reports_invalid_lines(self):
+        lines = [
+            self.specification_line("Specification 1", "Group 1"),
+            "{not json",
+            "",
+            self.specification_line("", "Group 3"),
+            self.specification_line("Specification 4", "Group 4"),
+        ]
+        response = self.post_lines(lines)
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["imported"], 2)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [2, 4])
+        self.assertIn("name", response.data["errors"][1]["errors"])
+        self.assertEqual(Specification.objects.count(), 2)
+
+    @override_settings(SPECIFICATION_IMPORT_MAX_ERRORS=2)
+    def test_import_stream_keeps_the_first_errors(self):
+        lines = ["{not json"] * 5 + [self.specification_line("Specification 6", "Group 6")]
+        response = self.post_lines(lines, chunk_size=2)
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["error_count"], 5)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [1, 2])
+
+    def test_import_stream_group_name_taken_by_committed_chunk(self):
+        lines = [
+            self.specification_line("Specification 1", "Group 1"),
+            self.specification_line("Specification 2", "Group 1"),
+        ]
+        response = self.post_lines(lines, chunk_size=1)
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["errors"][0]["line"], 2)
+        self.assertEqual(list(Specification.objects.values_list("name", flat=True)), ["Specification 1"])
+
+    def test_import_stream_invalid_chunk_size(self):
+        response = self.post_lines([self.specification_line("Specification 1", "Group 1")], chunk_size=0)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Specification.objects.count(), 0)
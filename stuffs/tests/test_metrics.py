@@ -0,0 +1,90 @@
+import re
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.metrics import registry
+from core.middleware import MetricsMiddleware
+
+from ..factories import ComponentFactory, SpecificationFactory
+from .helpers import local_specification_cache
+
+
+@local_specification_cache()
+class MetricsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory(status="Built")
+        ComponentFactory.create_batch(2, specification=self.specification)
+        registry.clear()
+
+    def metric(self, name, route):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+        match = re.search(
+            rf'^{name}{{route="{route}",method="GET",status="200"}} (\S+)$', response.content.decode(), re.M
+        )
+        self.assertIsNotNone(match, f"{name} of {route}")
+
+        return float(match.group(1))
+
+    def test_records_each_route(self):
+        url = f"/api/stuffs/specifications/{self.specification.pk}/components/"
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        query_count = len(queries)
+        # Served from the response cache
+        self.client.get(url)
+
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+        route = "specification-components-list"
+        self.assertEqual(self.metric("http_request_duration_seconds_count", route), 2)
+        self.assertEqual(self.metric("http_request_queries_total", route), query_count)
+        self.assertEqual(self.metric("http_response_size_bytes_total", route), 2 * len(response.content))
+        self.assertGreater(self.metric("http_request_query_seconds_total", route), 0)
+
+    def test_streamed_responses(self):
+        response = self.client.get("/api/stuffs/specifications/export_built_specification_report/")
+        content = b"".join(response.streaming_content)
+
+        route = "specification-export-built-specification-report"
+        self.assertEqual(self.metric("http_request_duration_seconds_count", route), 1)
+        self.assertEqual(self.metric("http_response_size_bytes_total", route), len(content))
+        self.assertGreater(self.metric("http_request_queries_total", route), 0)
+
+    async def test_async_requests(self):
+        response = await self.async_client.get(f"/api/stuffs/async/specifications/{self.specification.pk}/components/")
+
+        route = "async-specification-components"
+        self.assertIn("Server-Timing", response)
+        self.assertEqual(await sync_to_async(self.metric)("http_request_duration_seconds_count", route), 1)
+        # The ORM calls of the async view run in other threads, under the same request metrics
+        self.assertGreater(await sync_to_async(self.metric)("http_request_queries_total", route), 0)
+
+    async def test_async_streamed_responses(self):
+        async def chunks():
+            for chunk in [b"one,", b"two"]:
+                yield chunk
+
+        async def get_response(request):
+            return StreamingHttpResponse(chunks())
+
+        middleware = MetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get("/"))
+        # Recorded once sent
+        self.assertNotIn("unresolved", registry.render())
+
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(content, b"one,two")
+        self.assertEqual(
+            await sync_to_async(self.metric)("http_response_size_bytes_total", "unresolved"), len(content)
+        )
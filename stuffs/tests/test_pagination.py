@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..factories import ComponentFactory, SpecificationFactory
+from ..models import Specification
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specifications = SpecificationFactory.create_batch(25)
+        # Rows sharing a timestamp must still be paginated without gaps or duplicates
+        Specification.objects.filter(pk__in=[spec.pk for spec in self.specifications[5:15]]).update(
+            created=timezone.now()
+        )
+
+    def walk(self, url):
+        names, previous_urls = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            names.extend(item["name"] for item in response.data["results"])
+            previous_urls.append(response.data["previous"])
+            url = response.data["next"]
+
+        return names, previous_urls
+
+    def test_pages_cover_every_row_once_in_order(self):
+        names, _ = self.walk("/api/stuffs/specifications/?page_size=4")
+        expected = list(Specification.objects.order_by("-created", "-id").values_list("name", flat=True))
+
+        self.assertEqual(names, expected)
+
+    def test_previous_link(self):
+        first_page = self.client.get("/api/stuffs/specifications/?page_size=4").data
+        second_page = self.client.get(first_page["next"]).data
+        self.assertIsNone(first_page["previous"])
+
+        response = self.client.get(second_page["previous"])
+        self.assertEqual(response.data["results"], first_page["results"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_nested_components(self):
+        specification = self.specifications[0]
+        ComponentFactory.create_batch(7, specification=specification, group__specification=specification)
+        ComponentFactory.create_batch(3)
+
+        names, _ = self.walk(f"/api/stuffs/specifications/{specification.pk}/components/?page_size=3")
+        self.assertEqual(len(names), 7)
+
+    def test_deep_page_costs_the_same_as_the_first(self):
+        url = "/api/stuffs/specifications/?page_size=2"
+        with CaptureQueriesContext(connection) as first_page:
+            url = self.client.get(url).data["next"]
+        first_page_queries = len(first_page)
+        for _ in range(5):
+            url = self.client.get(url).data["next"]
+
+        with self.assertNumQueries(first_page_queries):
+            self.client.get(url)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/stuffs/specifications/?cursor=bogus")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,49 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .helpers import QueryCountMixin, create_specification
+
+
+class QueryBudgetTest(QueryCountMixin, TestCase):
+    """The number of queries of each endpoint must not grow with the number of rows it renders."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assertConstantQueries(self, url_for_size):
+        super().assertConstantQueries(self.client.get, url_for_size(1), url_for_size(5))
+
+    def test_specification_list(self):
+        def url_for_size(size):
+            for _ in range(size):
+                create_specification(size)
+            return f"/api/stuffs/specifications/?page_size={size}"
+
+        self.assertConstantQueries(url_for_size)
+
+    def test_specification_detail(self):
+        self.assertConstantQueries(lambda size: f"/api/stuffs/specifications/{create_specification(size).pk}/")
+
+    def test_nested_group_list(self):
+        self.assertConstantQueries(
+            lambda size: f"/api/stuffs/specifications/{create_specification(size).pk}/groups/?page_size=100"
+        )
+
+    def test_nested_component_list(self):
+        self.assertConstantQueries(
+            lambda size: f"/api/stuffs/specifications/{create_specification(size).pk}/components/?page_size=100"
+        )
+
+    def test_group_detail(self):
+        def url_for_size(size):
+            group = create_specification(size).groups.first()
+            return f"/api/stuffs/groups/{group.pk}/"
+
+        self.assertConstantQueries(url_for_size)
+
+    def test_component_detail(self):
+        def url_for_size(size):
+            component = create_specification(size).components.first()
+            return f"/api/stuffs/components/{component.pk}/"
+
+        self.assertConstantQueries(url_for_size)
@@ -0,0 +1,56 @@
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.middleware import ReplicaRoutingMiddleware
+
+from ..factories import SpecificationFactory
+from ..models import Specification
+
+
+def read_database(request):
+    return HttpResponse(Specification.objects.all().db)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], DATABASE_REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def request(self, request, view=read_database):
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_safe_requests_read_from_a_replica(self):
+        response = self.request(self.factory.get("/"))
+
+        self.assertEqual(response.content, b"replica_1")
+        self.assertNotIn(ReplicaRoutingMiddleware.cookie_name, response.cookies)
+        self.assertEqual(Specification.objects.all().db, "default")
+
+    def test_writes_stick_to_the_primary(self):
+        response = self.request(self.factory.post("/"))
+
+        self.assertEqual(response.content, b"default")
+        cookie = response.cookies[ReplicaRoutingMiddleware.cookie_name]
+        self.assertEqual(cookie["max-age"], 5)
+
+        self.factory.cookies[ReplicaRoutingMiddleware.cookie_name] = cookie.value
+        self.assertEqual(self.request(self.factory.get("/")).content, b"default")
+
+    def test_reads_after_a_write_use_the_primary(self):
+        def write_then_read(request):
+            SpecificationFactory()
+            return read_database(request)
+
+        self.assertEqual(self.request(self.factory.get("/"), write_then_read).content, b"default")
+
+    def test_streamed_responses(self):
+        def stream(request):
+            return StreamingHttpResponse(Specification.objects.all().db for _ in range(2))
+
+        response = self.request(self.factory.get("/"), stream)
+
+        self.assertEqual(b"".join(response.streaming_content), b"replica_1replica_1")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertEqual(self.request(self.factory.get("/")).content, b"default")
@@ -0,0 +1,127 @@
+from tempfile import TemporaryDirectory
+
+import environ
+from django.core.management import call_command
+from django.db import connection, models
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.reports import Report
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+from ..models import Specification
+from ..reports import report_engine
+from .helpers import local_specification_cache
+
+
+class ReportEngineTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.spec1 = SpecificationFactory(code_number="SPEC001", status="Built")
+        self.spec2 = SpecificationFactory(code_number="SPEC001", status="Planning Phase")
+        self.spec3 = SpecificationFactory(code_number="SPEC002", status="Built")
+        self.group = GroupFactory(specification=self.spec1, name="Doors")
+        ComponentFactory(specification=self.spec1, group=self.group, part_code="P1")
+        ComponentFactory(specification=self.spec1, group=self.group, part_code=None)
+        ComponentFactory(specification=self.spec1, group=None, part_code="P2")
+        self.month = timezone.localdate().replace(day=1)
+
+    def test_reports(self):
+        reports = Specification.reports.compute("status_distribution", "specifications_per_month", "parts_coverage")
+
+        self.assertEqual(
+            reports["status_distribution"],
+            [("SPEC001", "Built", 1), ("SPEC001", "Planning Phase", 1), ("SPEC002", "Built", 1)],
+        )
+        self.assertEqual(reports["specifications_per_month"], [(self.month, 3, 2)])
+        self.assertEqual(
+            reports["parts_coverage"], [(self.spec1.pk, "Doors", 2, 1, 50.0), (self.spec1.pk, None, 1, 1, 100.0)]
+        )
+
+    def test_reports_of_a_model_share_one_query(self):
+        with self.assertNumQueries(1):
+            Specification.reports.compute("status_distribution", "specifications_per_month")
+
+    def shared_caches(self):
+        """File-based caches, shared between processes like a production cache."""
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        backend = {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory.name}
+
+        return override_settings(CACHES={"default": backend, "specifications": backend})
+
+    def test_not_memoized_without_shared_versions(self):
+        for overrides in [override_settings(), local_specification_cache()]:
+            with overrides:
+                # Warned once per process
+                report_engine.warned = False
+                with self.assertLogs("core.reports", "WARNING"):
+                    Specification.reports.compute("status_distribution")
+                with self.assertNumQueries(1):
+                    Specification.reports.compute("status_distribution")
+
+    def test_memoized_with_a_database_cache(self):
+        backend = environ.Env.cache_url_config("dbcache://report_cache")
+        with override_settings(CACHES={"default": backend, "specifications": backend}):
+            call_command("createcachetable", verbosity=0)
+            url = "/api/stuffs/specifications/reports/"
+            response = self.client.get(url, {"report": "status_distribution"})
+
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url, {"report": "status_distribution"}).data, response.data)
+            self.assertFalse([query for query in queries if "stuffs_" in query["sql"]])
+
+    def test_memoized_until_the_data_changes(self):
+        with self.shared_caches():
+            self.check_memoized_until_the_data_changes()
+
+    def check_memoized_until_the_data_changes(self):
+        Specification.reports.compute("status_distribution", "parts_coverage")
+        with self.assertNumQueries(0):
+            Specification.reports.compute("status_distribution", "parts_coverage")
+
+        ComponentFactory(specification=self.spec3, group=None, part_code=None)
+
+        with self.assertNumQueries(2):
+            reports = Specification.reports.compute("status_distribution", "parts_coverage")
+        self.assertIn((self.spec3.pk, None, 1, 0, 0.0), reports["parts_coverage"])
+
+    def test_measures_must_be_additive(self):
+        with self.assertRaises(ValueError):
+            Report("codes", Specification, {}, {"codes": models.Count("code_number", distinct=True)})
+
+    def test_json(self):
+        response = self.client.get(
+            "/api/stuffs/specifications/reports/", {"report": ["status_distribution", "specifications_per_month"]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {"status_distribution", "specifications_per_month"})
+        self.assertEqual(
+            response.data["specifications_per_month"]["header"], ["Month", "Specifications", "Built Specifications"]
+        )
+        self.assertEqual(response.data["specifications_per_month"]["rows"], [(self.month, 3, 2)])
+
+        response = self.client.get("/api/stuffs/specifications/reports/", {"report": "unknown"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_csv_export(self):
+        response = self.client.get("/api/stuffs/specifications/reports/parts_coverage/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="parts_coverage_report.csv"')
+        self.assertEqual(
+            b"".join(response.streaming_content).decode().splitlines(),
+            [
+                "Specification,Group,Components,Components With a Part,Coverage (%)",
+                f"{self.spec1.pk},Doors,2,1,50.0",
+                f"{self.spec1.pk},,1,1,100.0",
+            ],
+        )
+
+        response = self.client.get("/api/stuffs/specifications/reports/unknown/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,117 @@
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..checks import check_specification_cache
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+from .helpers import local_specification_cache
+
+
+@local_specification_cache()
+class SpecificationResponseCacheTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory()
+        self.group = GroupFactory(specification=self.specification)
+        self.component = ComponentFactory(specification=self.specification, group=self.group, part_code=None)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response.data
+
+    def component_names(self):
+        return [
+            component["name"]
+            for component in self.get(f"/api/stuffs/specifications/{self.specification.pk}/components/")["results"]
+        ]
+
+    def test_cache_hit_does_not_query_the_tables(self):
+        for url in [
+            f"/api/stuffs/specifications/{self.specification.pk}/",
+            f"/api/stuffs/specifications/{self.specification.pk}/groups/",
+            f"/api/stuffs/specifications/{self.specification.pk}/components/",
+        ]:
+            data = self.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.get(url), data)
+            self.assertFalse([query for query in queries if "stuffs_" in query["sql"]], url)
+
+    def test_specification_write_invalidates_detail(self):
+        url = f"/api/stuffs/specifications/{self.specification.pk}/"
+        self.get(url)
+
+        self.specification.name = "Renamed"
+        self.specification.save()
+
+        self.assertEqual(self.get(url)["name"], "Renamed")
+
+    def test_component_writes_invalidate_the_tree(self):
+        url = f"/api/stuffs/specifications/{self.specification.pk}/"
+        self.assertEqual(self.component_names(), [self.component.name])
+        self.assertEqual(self.get(url)["components"], [self.component.name])
+
+        response = self.client.patch(
+            f"/api/stuffs/components/{self.component.pk}/assign_part/", {"part_code": "P-1"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.get(f"/api/stuffs/specifications/{self.specification.pk}/components/")["results"][0]["part_code"],
+            "P-1",
+        )
+
+        created = ComponentFactory(specification=self.specification, group=self.group)
+        self.assertCountEqual(self.component_names(), [self.component.name, created.name])
+        self.assertCountEqual(self.get(url)["components"], [self.component.name, created.name])
+
+    def test_cascade_delete_invalidates_the_tree(self):
+        self.assertEqual(self.component_names(), [self.component.name])
+
+        self.group.delete()
+
+        self.assertEqual(self.component_names(), [])
+        self.assertEqual(self.get(f"/api/stuffs/specifications/{self.specification.pk}/groups/")["results"], [])
+
+    def test_moving_a_component_invalidates_both_trees(self):
+        other_specification = SpecificationFactory()
+        other_url = f"/api/stuffs/specifications/{other_specification.pk}/components/"
+        self.assertEqual(self.component_names(), [self.component.name])
+        self.assertEqual(self.get(other_url)["results"], [])
+
+        self.component.specification, self.component.group = other_specification, None
+        self.component.save()
+
+        self.assertEqual(self.component_names(), [])
+        self.assertEqual(len(self.get(other_url)["results"]), 1)
+
+    def test_query_params_are_cached_separately(self):
+        ComponentFactory(specification=self.specification, group=self.group)
+        url = f"/api/stuffs/specifications/{self.specification.pk}/components/"
+
+        self.assertEqual(len(self.get(url)["results"]), 2)
+        self.assertEqual(len(self.get(f"{url}?page_size=1")["results"]), 1)
+
+    def test_clone_is_served_fresh(self):
+        response = self.client.post(f"/api/stuffs/specifications/{self.specification.pk}/clone/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        clone_url = response.data["cloned"]["url"]
+        self.assertEqual(self.get(clone_url)["components"], [self.component.name])
+
+
+class SpecificationCacheCheckTest(SimpleTestCase):
+    @local_specification_cache()
+    def test_process_local_cache_without_debug(self):
+        with override_settings(DEBUG=False):
+            self.assertEqual([error.id for error in check_specification_cache(None)], ["stuffs.W001"])
+
+    @local_specification_cache()
+    def test_process_local_cache_with_debug(self):
+        with override_settings(DEBUG=True):
+            self.assertEqual(check_specification_cache(None), [])
+
+    def test_default_cache(self):
+        with override_settings(DEBUG=False):
+            self.assertEqual(check_specification_cache(None), [])
@@ -0,0 +1,70 @@
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory()
+        self.group = GroupFactory(specification=self.specification, name="Kitchen cabinets", group_code="KIT-01")
+        self.by_part_code = ComponentFactory(
+            specification=self.specification, name="Hinge", description="Soft close", part_code="OAK-100"
+        )
+        self.by_name = ComponentFactory(
+            specification=self.specification, name="Oak door", description="Solid", part_code="DR-1"
+        )
+        self.other_specification_component = ComponentFactory(name="Oak shelf", description="Wall", part_code="SH-1")
+        ComponentFactory(specification=self.specification, name="Sink", description="Steel", part_code="SNK-1")
+
+    def search(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response.data
+
+    def test_search_components(self):
+        data = self.search("/api/stuffs/search/components/?q=oak")
+
+        names = [component["name"] for component in data["results"]]
+        self.assertCountEqual(
+            names, [self.by_part_code.name, self.by_name.name, self.other_specification_component.name]
+        )
+        # Part code prefix matches rank first
+        self.assertEqual(names[0], self.by_part_code.name)
+        self.assertNotIn("search_vector", data["results"][0])
+
+    def test_search_scoped_to_a_specification(self):
+        data = self.search(f"/api/stuffs/search/components/?q=oak&specification={self.specification.pk}")
+
+        self.assertEqual(
+            [component["name"] for component in data["results"]], [self.by_part_code.name, self.by_name.name]
+        )
+
+    def test_search_pages(self):
+        first_page = self.search("/api/stuffs/search/components/?q=oak&page_size=2")
+        second_page = self.search(first_page["next"])
+
+        names = [component["name"] for component in first_page["results"] + second_page["results"]]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(len(set(names)), 3)
+        self.assertIsNone(second_page["next"])
+        self.assertEqual(
+            [component["name"] for component in self.search(second_page["previous"])["results"]],
+            [component["name"] for component in first_page["results"]],
+        )
+
+    def test_search_groups(self):
+        data = self.search("/api/stuffs/search/groups/?q=kit")
+
+        self.assertEqual([group["name"] for group in data["results"]], [self.group.name])
+
+    def test_search_requires_a_query(self):
+        for url in [
+            "/api/stuffs/search/components/",
+            "/api/stuffs/search/components/?q=o",
+            "/api/stuffs/search/components/?q=--",
+        ]:
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
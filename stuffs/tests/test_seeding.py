@@ -0,0 +1,103 @@
+from collections import Counter
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..cache import specification_versions
+from ..models import BuiltSpecificationCount, Component, Group, Specification
+from ..seeding import DatasetGenerator, seed_dataset
+
+
+class DatasetGeneratorTest(TestCase):
+    def test_ranges(self):
+        generator = DatasetGenerator(600, seed=3)
+
+        self.assertEqual(list(generator.specifications(2, 4)), list(generator.specifications())[2:4])
+
+    def test_of_specifications(self):
+        generator = DatasetGenerator.of_specifications(
+            8,
+            groups_per_specification=2,
+            components_per_group=3,
+            ungrouped_components=1,
+            statuses={"Built": 3, "Design Phase": 1},
+        )
+        trees = list(generator.specifications())
+
+        self.assertEqual((generator.specification_count, generator.components), (8, 56))
+        self.assertEqual(Counter(tree["status"] for tree in trees), {"Built": 6, "Design Phase": 2})
+        self.assertEqual([len(group["components"]) for group in trees[0]["groups"]], [3, 3])
+        self.assertEqual(len(trees[0]["components"]), 1)
+
+
+class SeedDataTest(TestCase):
+    def seed_data(self, *args):
+        call_command("seed_data", *args, stdout=StringIO())
+
+    def test_seed_data(self):
+        self.seed_data(
+            "--specifications=12",
+            "--groups-per-specification=2",
+            "--components-per-group=4",
+            "--ungrouped-components=2",
+            "--statuses=Built=1,Planning Phase=2",
+            "--missing-part-ratio=0.5",
+            "--chunk-size=5",
+        )
+
+        self.assertEqual(Specification.objects.count(), 12)
+        self.assertEqual(Group.objects.count(), 24)
+        self.assertEqual(Component.objects.count(), 120)
+        self.assertEqual(Component.objects.filter(group=None).count(), 24)
+        self.assertEqual(Specification.objects.filter(status="Built").count(), 4)
+        self.assertFalse(Specification.objects.drifted_counters().exists())
+        self.assertEqual(
+            sum(Specification.objects.values_list("missing_part_count", flat=True)),
+            Component.objects.filter(Component.MISSING_PART).count(),
+        )
+        self.assertEqual(
+            dict(BuiltSpecificationCount.objects.values_list("code_number", "built_count")),
+            {row["code_number"]: row["built_count"] for row in Specification.reports.scan_built_count()},
+        )
+
+    def test_same_seed_same_data(self):
+        def snapshot():
+            return list(Component.objects.order_by("name").values_list("name", "description", "part_code"))
+
+        self.seed_data("--specifications=3", "--seed=7")
+        first = snapshot()
+        self.seed_data("--specifications=3", "--seed=7", "--reset")
+
+        self.assertEqual(snapshot(), first)
+
+    def test_seed_data_twice(self):
+        self.seed_data("--specifications=3", "--statuses=Built")
+
+        with self.assertRaisesMessage(CommandError, "--reset"):
+            self.seed_data("--specifications=5")
+        self.assertEqual(Specification.objects.count(), 3)
+
+        self.seed_data("--specifications=5", "--statuses=Built", "--reset")
+        self.assertEqual(Specification.objects.count(), 5)
+        self.assertEqual(Group.objects.values("name").distinct().count(), Group.objects.count())
+        self.assertEqual(sum(BuiltSpecificationCount.objects.values_list("built_count", flat=True)), 5)
+
+    def test_interrupted_run_keeps_the_built_counts(self):
+        generator = DatasetGenerator.of_specifications(4, statuses={"Built": 1})
+
+        with mock.patch.object(specification_versions, "bump", side_effect=[None, RuntimeError("Interrupted")]):
+            with self.assertRaises(RuntimeError):
+                seed_dataset(generator, chunk_size=2)
+
+        self.assertEqual(Specification.objects.count(), 2)
+        self.assertEqual(
+            dict(BuiltSpecificationCount.objects.values_list("code_number", "built_count")),
+            {"SPEC-000": 1, "SPEC-001": 1},
+        )
+
+    def test_invalid_statuses(self):
+        with self.assertRaisesMessage(CommandError, "Unknown status: 'Done'"):
+            self.seed_data("--statuses=Done=1")
@@ -1,7 +1,11 @@
+from django.db import connection
+from django.db.models import Count
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.exceptions import ValidationError
 
 from stuffs.factories import ComponentFactory, GroupFactory, SpecificationFactory
+from stuffs.models import Specification
 from stuffs.serializers import (
     ComponentSerializer,
     GroupSerializer,
@@ -129,3 +133,55 @@ class SpecificationCloneSerializerTest(TestCase):
         serializer = SpecificationCloneSerializer(data=data)
         with self.assertRaises(ValidationError):
             serializer.is_valid(raise_exception=True)
+
+    def test_clone_checks_the_status_again(self):
+        serializer = SpecificationCloneSerializer(data={}, specification=self.specification)
+        self.assertTrue(serializer.is_valid())
+        # Changed by another request after the validation
+        Specification.objects.filter(pk=self.specification.pk).update(status="Built")
+
+        with self.assertRaises(ValidationError):
+            serializer.clone()
+        self.assertEqual(Specification.objects.count(), 1)
+
+    def test_clone_maps_components_to_cloned_groups(self):
+        # Groups sharing a name must not be merged in the clone
+        twin_group = GroupFactory(specification=self.specification, name=self.group.name)
+        ComponentFactory.create_batch(2, specification=self.specification, group=twin_group)
+        ComponentFactory(specification=self.specification, group=None)
+
+        serializer = SpecificationCloneSerializer(data={"include_parts": False}, specification=self.specification)
+        self.assertTrue(serializer.is_valid())
+        cloned_specification = serializer.clone()
+
+        self.assertEqual(cloned_specification.status, "Planning Phase")
+        self.assertEqual(
+            sorted(cloned_specification.groups.annotate(count=Count("components")).values_list("count", flat=True)),
+            [1, 2],
+        )
+        self.assertEqual(cloned_specification.components.filter(group=None).count(), 1)
+        self.assertFalse(
+            cloned_specification.components.exclude(group__specification=cloned_specification)
+            .exclude(group=None)
+            .exists()
+        )
+        self.assertFalse(cloned_specification.components.exclude(part_code=None).exists())
+        self.assertFalse(self.specification.components.filter(part_code=None).exists())
+
+    def test_clone_query_count_does_not_grow_with_components(self):
+        serializer = SpecificationCloneSerializer(data={"include_parts": True}, specification=self.specification)
+        self.assertTrue(serializer.is_valid())
+        with CaptureQueriesContext(connection) as small_clone:
+            serializer.clone()
+        small_clone_queries = len(small_clone)
+
+        for group in GroupFactory.create_batch(5, specification=self.specification):
+            ComponentFactory.create_batch(5, specification=self.specification, group=group)
+
+        with self.assertNumQueries(small_clone_queries):
+            cloned_specification = serializer.clone()
+        self.assertEqual(cloned_specification.components.count(), 26)
+        self.assertEqual(
+            set(cloned_specification.components.values_list("part_code", flat=True)),
+            set(self.specification.components.values_list("part_code", flat=True)),
+        )
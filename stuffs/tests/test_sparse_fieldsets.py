@@ -0,0 +1,66 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+
+
+class SparseFieldsetsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory()
+        self.group = GroupFactory(specification=self.specification, name="Kitchen", group_code="KIT-1")
+        ComponentFactory.create_batch(3, specification=self.specification, group=self.group)
+        ComponentFactory(specification=self.specification, group=self.group, name="Oak door", part_code=None)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return response.data
+
+    def assertSameFields(self, url, fields):
+        full = self.get(url)
+        sparse = self.get(f"{url}{'&' if '?' in url else '?'}fields={','.join(fields)}")
+
+        self.assertEqual(
+            sparse["results"], [{name: row[name] for name in row if name in fields} for row in full["results"]]
+        )
+        self.assertEqual(
+            [list(row) for row in sparse["results"]],
+            [[name for name in row if name in fields] for row in full["results"]],
+        )
+
+    def test_plain_columns_keep_their_representation(self):
+        self.assertSameFields("/api/stuffs/specifications/", ["name", "status", "created", "completed"])
+        self.assertSameFields(f"/api/stuffs/specifications/{self.specification.pk}/components/", ["name", "part_code"])
+        self.assertSameFields("/api/stuffs/search/components/?q=oak", ["name", "modified"])
+
+    def test_related_fields(self):
+        self.assertSameFields(f"/api/stuffs/specifications/{self.specification.pk}/groups/", ["url", "components"])
+        self.assertSameFields("/api/stuffs/specifications/", ["name", "groups"])
+
+    def test_id(self):
+        data = self.get(f"/api/stuffs/specifications/{self.specification.pk}/components/?fields=id,name")
+
+        self.assertEqual(
+            {row["id"] for row in data["results"]}, set(self.specification.components.values_list("id", flat=True))
+        )
+
+    def test_plain_columns_skip_model_instances(self):
+        url = f"/api/stuffs/specifications/{self.specification.pk}/components/?fields=name,part_code&page_size=2"
+
+        with CaptureQueriesContext(connection) as queries:
+            next_page = self.get(url)["next"]
+        components_query = next(query["sql"] for query in queries if 'FROM "stuffs_component"' in query["sql"])
+        self.assertNotIn('"description"', components_query)
+
+        self.assertEqual(len(self.get(next_page)["results"]), 2)
+
+    def test_unknown_fields(self):
+        for fields in ["name,secret", ","]:
+            response = self.client.get(f"/api/stuffs/specifications/?fields={fields}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("fields", response.data)
@@ -0,0 +1,144 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+from ..models import Specification
+from .helpers import local_specification_cache
+
+
+class SpecificationCountersTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory()
+        self.group = GroupFactory(specification=self.specification)
+        self.component = ComponentFactory(specification=self.specification, group=self.group, part_code=None)
+        ComponentFactory(specification=self.specification, group=None, part_code="P-1")
+
+    def assertCounters(self, specification, component_count, missing_part_count):
+        specification.refresh_from_db()
+        self.assertEqual(
+            (specification.component_count, specification.missing_part_count), (component_count, missing_part_count)
+        )
+        self.assertFalse(Specification.objects.drifted_counters().exists())
+
+    def test_component_writes(self):
+        self.assertCounters(self.specification, 2, 1)
+
+        response = self.client.patch(
+            f"/api/stuffs/components/{self.component.pk}/assign_part/", {"part_code": "P-2"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounters(self.specification, 2, 0)
+
+        other_specification = SpecificationFactory()
+        self.component.refresh_from_db()
+        self.component.specification, self.component.group, self.component.part_code = other_specification, None, ""
+        self.component.save()
+        self.assertCounters(self.specification, 1, 0)
+        self.assertCounters(other_specification, 1, 1)
+
+        self.component.delete()
+        self.assertCounters(other_specification, 0, 0)
+
+    def test_cascade_deletes(self):
+        ComponentFactory.create_batch(3, specification=self.specification, group=self.group, part_code=None)
+        self.assertCounters(self.specification, 5, 4)
+
+        self.group.delete()
+        self.assertCounters(self.specification, 1, 0)
+
+        self.specification.delete()
+        self.assertFalse(Specification.objects.drifted_counters().exists())
+
+    def test_bulk_writes(self):
+        response = self.client.patch(
+            "/api/stuffs/components/assign_parts/",
+            {"components": [{"id": self.component.pk, "part_code": "P-2"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounters(self.specification, 2, 0)
+
+        response = self.client.post(f"/api/stuffs/specifications/{self.specification.pk}/clone/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertCounters(Specification.objects.latest("id"), 2, 2)
+
+        response = self.client.post(
+            "/api/stuffs/specifications/import_data/",
+            {
+                "specifications": [
+                    {
+                        "name": "Imported",
+                        "code_number": "IMP-1",
+                        "status": "Planning Phase",
+                        "components": [{"name": "Door", "description": "Front door", "part_code": None}],
+                    }
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertCounters(Specification.objects.get(name="Imported"), 1, 1)
+
+    def test_list_exposes_counters(self):
+        response = self.client.get("/api/stuffs/specifications/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["component_count"], 2)
+        self.assertEqual(response.data["results"][0]["missing_part_count"], 1)
+
+    def test_counters_are_read_only(self):
+        response = self.client.patch(
+            f"/api/stuffs/specifications/{self.specification.pk}/", {"missing_part_count": 0}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounters(self.specification, 2, 1)
+
+    def test_saving_a_loaded_specification_keeps_the_counters(self):
+        specification = Specification.objects.get(pk=self.specification.pk)
+        ComponentFactory(specification=self.specification, part_code=None)
+
+        specification.name = "Renamed"
+        specification.save()
+
+        self.assertCounters(self.specification, 3, 2)
+
+    def test_saving_a_copy_or_a_deleted_specification(self):
+        specification = Specification.objects.get(pk=self.specification.pk)
+        specification.pk = None
+        specification.save()
+        self.assertEqual(Specification.objects.count(), 2)
+
+        specification.delete()
+        specification.save()
+        self.assertTrue(Specification.objects.filter(pk=specification.pk).exists())
+
+        pk = specification.pk
+        Specification.objects.filter(pk=pk).delete()
+        specification.save(force_insert=True)
+        self.assertEqual(specification.pk, pk)
+        self.assertTrue(Specification.objects.filter(pk=pk).exists())
+
+    def test_repair_command(self):
+        Specification.objects.filter(pk=self.specification.pk).update(component_count=7, missing_part_count=0)
+
+        with self.assertRaises(CommandError):
+            call_command("repair_specification_counters", "--check", stdout=StringIO())
+
+        call_command("repair_specification_counters", stdout=StringIO())
+        self.assertCounters(self.specification, 2, 1)
+        call_command("repair_specification_counters", "--check", stdout=StringIO())
+
+    @local_specification_cache()
+    def test_repair_command_invalidates_the_cached_tree(self):
+        url = f"/api/stuffs/specifications/{self.specification.pk}/"
+        Specification.objects.filter(pk=self.specification.pk).update(component_count=7)
+        self.assertEqual(self.client.get(url).data["component_count"], 7)
+
+        call_command("repair_specification_counters", stdout=StringIO())
+        self.assertEqual(self.client.get(url).data["component_count"], 2)
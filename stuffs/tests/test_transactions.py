@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import exceptions, status
+from rest_framework.test import APIClient
+
+from ..factories import ComponentFactory, GroupFactory, SpecificationFactory
+from ..viewsets import ComponentViewSet
+
+
+class TransactionPolicyTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.specification = SpecificationFactory()
+        self.group = GroupFactory(specification=self.specification)
+        self.component = ComponentFactory(specification=self.specification, group=self.group)
+
+    def capture(self, method, url, data=None):
+        """Return the SQL of the request; inside a test case, each ``atomic()`` block shows as a savepoint."""
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format="json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, status.HTTP_400_BAD_REQUEST, url)
+
+        return [query["sql"] for query in queries]
+
+    def test_reads_run_in_autocommit(self):
+        for url in [
+            "/api/stuffs/specifications/",
+            f"/api/stuffs/specifications/{self.specification.pk}/",
+            f"/api/stuffs/specifications/{self.specification.pk}/components/",
+            f"/api/stuffs/groups/{self.group.pk}/",
+            "/api/stuffs/specifications/export_built_specification_report/",
+        ]:
+            self.assertFalse([sql for sql in self.capture("get", url) if sql.startswith("SAVEPOINT")], url)
+
+    def test_writes_run_in_a_transaction(self):
+        for method, url, data in [
+            ("patch", f"/api/stuffs/specifications/{self.specification.pk}/", {"name": "Renamed"}),
+            ("patch", f"/api/stuffs/components/{self.component.pk}/", {"name": "Renamed"}),
+            ("delete", f"/api/stuffs/groups/{self.group.pk}/", None),
+        ]:
+            queries = self.capture(method, url, data)
+
+            self.assertTrue(queries[0].startswith("SAVEPOINT"), url)
+
+    def test_error_responses_roll_back_the_writes(self):
+        def perform_update(viewset, serializer):
+            serializer.save()
+            raise exceptions.ValidationError("Failed after the write.")
+
+        with mock.patch.object(ComponentViewSet, "perform_update", perform_update):
+            response = self.client.patch(
+                f"/api/stuffs/components/{self.component.pk}/", {"name": "Renamed"}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.component.refresh_from_db()
+        self.assertNotEqual(self.component.name, "Renamed")
+
+    def test_imports_validate_before_the_transaction(self):
+        queries = self.capture(
+            "post",
+            "/api/stuffs/specifications/import_data/",
+            {
+                "specifications": [
+                    {
+                        "name": "Imported",
+                        "code_number": "IMP-1",
+                        "status": "Planning Phase",
+                        "groups": [{"name": "Imported group", "group_code": "G-1", "components": []}],
+                    }
+                ]
+            },
+        )
+
+        first_savepoint = next(index for index, sql in enumerate(queries) if sql.startswith("SAVEPOINT"))
+        self.assertTrue(any('FROM "stuffs_group"' in sql for sql in queries[:first_savepoint]))
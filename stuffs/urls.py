@@ -1,13 +1,16 @@
 from django.urls import include, path
 from rest_framework_nested import routers
 
-from stuffs import viewsets
+from stuffs import async_views, viewsets
 
 router = routers.DefaultRouter()
 
 router.register("specifications", viewsets.SpecificationViewSet, basename="specification")
 router.register("groups", viewsets.GroupViewSet, basename="group")
 router.register("components", viewsets.ComponentViewSet, basename="component")
+router.register("import_jobs", viewsets.ImportJobViewSet, basename="importjob")
+router.register("search/groups", viewsets.GroupSearchViewSet, basename="group-search")
+router.register("search/components", viewsets.ComponentSearchViewSet, basename="component-search")
 
 # Nested Routes
 specifications_router = routers.NestedSimpleRouter(router, "specifications", lookup="specification")
@@ -16,4 +19,24 @@ specifications_router.register(
     r"components", viewsets.NestedSpecificationComponentsViewSet, basename="specification-components"
 )
 
-urlpatterns = [path("", include(router.urls)), path("", include(specifications_router.urls))]
+# Read endpoints served natively by the ASGI application
+async_urlpatterns = [
+    path("specifications/", async_views.SpecificationListView.as_view(), name="async-specification-list"),
+    path("specifications/<int:pk>/", async_views.SpecificationDetailView.as_view(), name="async-specification-detail"),
+    path(
+        "specifications/<int:specification_pk>/groups/",
+        async_views.SpecificationGroupListView.as_view(),
+        name="async-specification-groups",
+    ),
+    path(
+        "specifications/<int:specification_pk>/components/",
+        async_views.SpecificationComponentListView.as_view(),
+        name="async-specification-components",
+    ),
+]
+
+urlpatterns = [
+    path("", include(router.urls)),
+    path("", include(specifications_router.urls)),
+    path("async/", include(async_urlpatterns)),
+]
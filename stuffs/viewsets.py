@@ -1,27 +1,85 @@
-import pandas as pd
-from django.http import HttpResponse
+import json
+
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from core.viewmixins import NestedObjectMixin
-from core.viewsets import CreateListViewSet, RetrieveUpdateDestroyViewset
+from core.exports import streaming_csv_response
+from core.pagination import RankedKeysetPagination
+from core.renderers import NDJSONRenderer
+from core.viewmixins import (
+    AtomicActionsMixin,
+    ConditionalRequestMixin,
+    NestedObjectMixin,
+    SparseFieldsetMixin,
+    VersionedCacheMixin,
+)
+from core.viewsets import CreateListViewSet, ListViewSet, RetrieveUpdateDestroyViewset, RetrieveViewSet
 
-from .models import Component, Group, Specification
+from .cache import specification_versions
+from .conditional import (
+    cached_specification_tree_validator,
+    component_validator,
+    group_validator,
+    specification_tree_validator,
+)
+from .exporters import SpecificationTreeExporter, json_export, ndjson_export
+from .importers import ChunkedSpecificationImport
+from .jobs import enqueue_import_job
+from .models import Component, Group, ImportJob, Specification
+from .reports import report_engine
+from .search import search
 from .serializers import (
     ComponentSerializer,
     GroupSerializer,
+    ImportJobSerializer,
     PartCodeAssignmentSerializer,
+    PartCodeBulkAssignmentSerializer,
+    QueuedSpecificationImportSerializer,
+    ReportOptionsSerializer,
+    SearchOptionsSerializer,
+    SpecificationBatchCloneSerializer,
     SpecificationCloneSerializer,
+    SpecificationExportOptionsSerializer,
+    SpecificationImportExportSerializer,
+    SpecificationImportOptionsSerializer,
     SpecificationImportSerializer,
     SpecificationSerializer,
 )
 
 
-class SpecificationViewSet(ModelViewSet):
-    queryset = Specification.objects.all()
+class SpecificationTreeConditionalMixin(ConditionalRequestMixin):
+    """Validate the responses of a specification endpoint against the whole tree of the specification."""
+
+    def get_validator(self, lock=False):
+        pk = self.get_cache_object_pk()
+        if pk is None:
+            return None
+
+        if self.request.method in SAFE_METHODS:
+            return cached_specification_tree_validator(pk)
+        return specification_tree_validator(pk, lock=lock)
+
+
+class SpecificationViewSet(
+    AtomicActionsMixin, SpecificationTreeConditionalMixin, VersionedCacheMixin, SparseFieldsetMixin, ModelViewSet
+):
+    queryset = Specification.objects.prefetch_related(
+        Prefetch("groups", queryset=Group.objects.only("name", "specification")),
+        Prefetch("components", queryset=Component.objects.only("name", "specification")),
+    )
     serializer_class = SpecificationSerializer
+    # The importer and the cloner open their own transactions once the payload is validated
+    non_atomic_actions = ("import_data", "import_stream", "clone", "clone_batch")
+    cache_versions = specification_versions
+    cached_actions = ("retrieve",)
+    conditional_actions = ("retrieve", "update", "partial_update", "destroy")
 
     @action(detail=True, methods=["post"], serializer_class=SpecificationCloneSerializer)
     def clone(self, request, *args, **kwargs):
@@ -38,8 +96,34 @@ class SpecificationViewSet(ModelViewSet):
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"], serializer_class=SpecificationBatchCloneSerializer)
+    def clone_batch(self, request):
+        serializer = self.get_serializer(data=request.data)
+
+        if serializer.is_valid():
+            cloned_specifications = serializer.clone()
+
+            return Response(
+                {
+                    "status": "Specifications cloned successfully!",
+                    "cloned": [specification.pk for specification in cloned_specifications],
+                },
+                status=status.HTTP_201_CREATED,
+            )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
     @action(detail=False, methods=["post"], serializer_class=SpecificationImportSerializer)
     def import_data(self, request):
+        options = SpecificationImportOptionsSerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+
+        if options.validated_data["background"]:
+            serializer = QueuedSpecificationImportSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            lines = (json.dumps(spec_data) for spec_data in serializer.validated_data["specifications"])
+
+            return self.queue_import(lines, options.validated_data["chunk_size"])
+
         serializer = SpecificationImportSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
@@ -50,22 +134,111 @@ class SpecificationViewSet(ModelViewSet):
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"], serializer_class=SpecificationImportOptionsSerializer)
+    def import_stream(self, request):
+        options = SpecificationImportOptionsSerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+
+        if options.validated_data["background"]:
+            return self.queue_import(request.stream or [], options.validated_data["chunk_size"])
+
+        result = ChunkedSpecificationImport(
+            SpecificationImportExportSerializer, chunk_size=options.validated_data["chunk_size"]
+        ).run(request.stream or [])
+
+        if not result.error_count:
+            response_status = status.HTTP_201_CREATED
+        elif result.imported:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response(
+            {
+                "lines": result.lines,
+                "imported": result.imported,
+                "error_count": result.error_count,
+                "errors": result.errors,
+            },
+            status=response_status,
+        )
+
+    def queue_import(self, lines, chunk_size):
+        job = enqueue_import_job(lines, chunk_size)
+        job_serializer = ImportJobSerializer(job, context={"request": self.request})
+
+        return Response(
+            {"status": "Specifications import queued.", "job": job_serializer.data},
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": job_serializer.data["url"]},
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[JSONRenderer, NDJSONRenderer],
+        serializer_class=SpecificationExportOptionsSerializer,
+    )
+    def export_data(self, request):
+        options = SpecificationExportOptionsSerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+
+        chunks = SpecificationTreeExporter(chunk_size=options.validated_data["chunk_size"]).chunks()
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            response = StreamingHttpResponse(ndjson_export(chunks), content_type=NDJSONRenderer.media_type)
+        else:
+            response = StreamingHttpResponse(json_export(chunks), content_type="application/json")
+        response["Content-Disposition"] = f'attachment; filename="specifications.{request.accepted_renderer.format}"'
+
+        return response
+
     @action(detail=False, methods=["get"])
     def export_built_specification_report(self, request):
-        built_count = Specification.reports.built_count()
-        df = pd.DataFrame.from_records(built_count)
+        built_count = Specification.reports.built_count().values_list("code_number", "built_count")
 
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="built_specifications_report.csv"'
+        return streaming_csv_response(
+            built_count.iterator(chunk_size=2000),
+            header=["Specification Code", "Number of Built Specifications"],
+            filename="built_specifications_report.csv",
+        )
 
-        df.to_csv(path_or_buf=response, index=False, header=["Specification Code", "Number of Built Specifications"])
+    @action(detail=False, methods=["get"], serializer_class=ReportOptionsSerializer)
+    def reports(self, request):
+        options = ReportOptionsSerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
 
-        return response
+        results = Specification.reports.compute(*(options.validated_data.get("report") or report_engine.reports))
 
+        return Response(
+            {name: {"header": report_engine.reports[name].header, "rows": rows} for name, rows in results.items()}
+        )
 
-class BaseNestedSpecificationViewSet(NestedObjectMixin, CreateListViewSet):
+    @action(detail=False, methods=["get"], url_path=r"reports/(?P<report>[\w-]+)")
+    def export_report(self, request, report):
+        if report not in report_engine.reports:
+            raise NotFound(f"Unknown report: {report}.")
+
+        return streaming_csv_response(
+            Specification.reports.compute(report)[report],
+            header=report_engine.reports[report].header,
+            filename=f"{report}_report.csv",
+        )
+
+
+class BaseNestedSpecificationViewSet(
+    AtomicActionsMixin,
+    NestedObjectMixin,
+    SpecificationTreeConditionalMixin,
+    VersionedCacheMixin,
+    SparseFieldsetMixin,
+    CreateListViewSet,
+):
     parent_model = Specification
     parent_object_lookup_field = "specification_pk"
+    cache_versions = specification_versions
+    cached_actions = ("list",)
+    cache_lookup_url_kwarg = "specification_pk"
+    conditional_actions = ("list", "create")
 
     def get_serializer(self, *args, **kwargs):
         kwargs.update(specification=self.get_parent_object())
@@ -80,7 +253,9 @@ class NestedSpecificationGroupViewSet(BaseNestedSpecificationViewSet):
     serializer_class = GroupSerializer
 
     def get_queryset(self):
-        return Group.objects.filter(specification_id=self.look_up_field_value)
+        return Group.objects.filter(specification_id=self.look_up_field_value).prefetch_related(
+            Prefetch("components", queryset=Component.objects.only("name", "group"))
+        )
 
 
 class NestedSpecificationComponentsViewSet(BaseNestedSpecificationViewSet):
@@ -90,14 +265,21 @@ class NestedSpecificationComponentsViewSet(BaseNestedSpecificationViewSet):
         return Component.objects.filter(specification_id=self.look_up_field_value)
 
 
-class GroupViewSet(RetrieveUpdateDestroyViewset):
-    queryset = Group.objects.all()
+class GroupViewSet(AtomicActionsMixin, ConditionalRequestMixin, RetrieveUpdateDestroyViewset):
+    queryset = Group.objects.prefetch_related(Prefetch("components", queryset=Component.objects.only("name", "group")))
     serializer_class = GroupSerializer
 
+    def get_validator(self, lock=False):
+        return group_validator(self.kwargs["pk"], lock=lock)
 
-class ComponentViewSet(RetrieveUpdateDestroyViewset):
-    queryset = Component.objects.all()
+
+class ComponentViewSet(AtomicActionsMixin, ConditionalRequestMixin, RetrieveUpdateDestroyViewset):
+    queryset = Component.objects.select_related("specification")
     serializer_class = ComponentSerializer
+    non_atomic_actions = ("assign_parts",)
+
+    def get_validator(self, lock=False):
+        return component_validator(self.kwargs["pk"], lock=lock)
 
     @action(detail=True, methods=["patch"], serializer_class=PartCodeAssignmentSerializer)
     def assign_part(self, request, *args, **kwargs):
@@ -115,3 +297,54 @@ class ComponentViewSet(RetrieveUpdateDestroyViewset):
             )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["patch"], serializer_class=PartCodeBulkAssignmentSerializer)
+    def assign_parts(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.assign()
+
+        assigned = sum(result["status"] == "part_assigned" for result in results)
+        if assigned == len(results):
+            response_status = status.HTTP_200_OK
+        elif assigned:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response({"assigned": assigned, "results": results}, status=response_status)
+
+
+class ImportJobViewSet(RetrieveViewSet):
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+
+
+class BaseSearchViewSet(SparseFieldsetMixin, ListViewSet):
+    pagination_class = RankedKeysetPagination
+    code_field = None
+    text_fields = ()
+
+    def get_queryset(self):
+        options = SearchOptionsSerializer(data=self.request.query_params)
+        options.is_valid(raise_exception=True)
+
+        queryset = super().get_queryset()
+        if "specification" in options.validated_data:
+            queryset = queryset.filter(specification_id=options.validated_data["specification"])
+
+        return search(queryset, options.validated_data["q"], self.code_field, self.text_fields)
+
+
+class GroupSearchViewSet(BaseSearchViewSet):
+    queryset = Group.objects.prefetch_related(Prefetch("components", queryset=Component.objects.only("name", "group")))
+    serializer_class = GroupSerializer
+    code_field = "group_code"
+    text_fields = ("name", "group_code")
+
+
+class ComponentSearchViewSet(BaseSearchViewSet):
+    queryset = Component.objects.all()
+    serializer_class = ComponentSerializer
+    code_field = "part_code"
+    text_fields = ("name", "description", "part_code")